@@ -0,0 +1,25 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Plugin managing the resources shared by the I3py starters.
+
+"""
+from enaml.workbench.api import Plugin
+
+from .starters.pool import shutdown_pools
+
+
+class I3pyInstrPlugin(Plugin):
+    """Plugin finalizing the pooled drivers when the application stops.
+
+    """
+    def stop(self):
+        """Finalize the idle drivers kept alive by the starters.
+
+        """
+        shutdown_pools()
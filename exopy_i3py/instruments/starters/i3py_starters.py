@@ -9,21 +9,57 @@
 """Starter for I3py drivers.
 
 """
+from collections.abc import Mapping
+
+from atom.api import Bool, Float, Typed
 from exopy.instruments.api import BaseStarter
 
+from ...tasks.instructions.accessors import clear_resolution_cache
+from .parallel import run_concurrently
+from .pool import DriverPool, make_pool_key
+from .simulation import SIM_BACKEND, build_sim_backend, add_simulated_latency
+
 
 class I3pyStarter(BaseStarter):
     """Starter for I3py based drivers.
 
     """
+    #: Whether to keep all the drivers alive between measurements. Stopped
+    #: drivers are kept in a pool and handed back (after clearing their
+    #: cache) when a driver with the same class, connection and settings is
+    #: started. Drivers can also be pooled individually through the 'pooled'
+    #: entry of their settings.
+    pooled = Bool()
+
+    #: Time in seconds after which an unused pooled driver is finalized.
+    idle_timeout = Float(600.0)
+
+    #: Pool of the drivers kept alive.
+    pool = Typed(DriverPool)
+
+    def __init__(self, **kwargs):
+        super(I3pyStarter, self).__init__(**kwargs)
+        # Created eagerly as the drivers may be started from several threads.
+        self.pool = DriverPool(self.idle_timeout)
+
     def start(self, driver_cls, connection, settings):
         """Pass the connection parameters as keywords and pack settings in
 
         """
         kwargs, parameters = self.pack_initialize_arguments(connection,
                                                             settings)
+        pooled = self.pooled or _is_pooled(settings)
+        if pooled:
+            key = make_pool_key(driver_cls, kwargs, parameters)
+            driver = self.pool.acquire(key)
+            if driver is not None:
+                self.reset(driver)
+                return driver
+
         driver = driver_cls(parameters=parameters, **kwargs)
         driver.initialize()
+        if pooled:
+            self.pool.register(key, driver)
         return driver
 
     def check_infos(self, driver_cls, connection, settings):
@@ -42,49 +78,160 @@ class I3pyStarter(BaseStarter):
 
         return True
 
+    def start_many(self, profiles, max_workers=None, timeout=None):
+        """Start several drivers concurrently.
+
+        Parameters
+        ----------
+        profiles : dict
+            Mapping between an id identifying each instrument and a tuple
+            (driver_cls, connection, settings) as passed to start.
+
+        max_workers : int, optional
+            Maximal number of drivers started at the same time.
+
+        timeout : float, optional
+            Time in seconds allowed to start each driver. A driver starting
+            after the timeout expired is stopped right away.
+
+        Returns
+        -------
+        drivers : dict
+            Drivers which were successfully started.
+
+        errors : dict
+            Formatted tracebacks of the drivers which failed to start.
+
+        """
+        return run_concurrently(self.start, profiles, max_workers, timeout,
+                                on_late=self.stop)
+
+    def check_many_infos(self, profiles, max_workers=None, timeout=None):
+        """Check concurrently that several drivers can be initialized.
+
+        Parameters
+        ----------
+        profiles : dict
+            Mapping between an id identifying each instrument and a tuple
+            (driver_cls, connection, settings) as passed to check_infos.
+
+        max_workers : int, optional
+            Maximal number of drivers checked at the same time.
+
+        timeout : float, optional
+            Time in seconds allowed to check each driver. Drivers whose check
+            times out are considered invalid.
+
+        Returns
+        -------
+        results : dict
+            Mapping between the ids and the result of the check.
+
+        """
+        results, errors = run_concurrently(self.check_infos, profiles,
+                                           max_workers, timeout)
+        results.update((k, False) for k in errors)
+        return results
+
     def stop(self, driver):
         """Stop the driver by calling finalize.
 
+        Pooled drivers are returned to the pool instead.
+
         """
-        driver.finalize()
+        clear_resolution_cache(driver)
+        if not self.pool.release(driver):
+            driver.finalize()
 
     def reset(self, driver):
         """Clean the cached value incase th user made a manual modification.
 
+        The channels and subsystems resolved by the instructions are also
+        discarded.
+
         """
+        clear_resolution_cache(driver)
         driver.clear_cache()
 
     def pack_initialize_arguments(self, connection, settings):
         """Pack the arguments in two dict.
 
         The first dict is unpacked when calling initialized, the second one is
-        passed as 'parameters'
+        passed as 'parameters'. The pooled setting is only used by the starter.
 
         """
-        conn_infos = connection.gather_infos()
-        sett_infos = settings.gather_infos()
-        sett_infos.pop('id')
-        sett_infos.pop('user_id')
+        conn_infos = _gather_infos(connection)
+        sett_infos = _gather_infos(settings)
+        sett_infos.pop('id', None)
+        sett_infos.pop('user_id', None)
+        sett_infos.pop('pooled', None)
         return conn_infos, sett_infos
 
+    # --- Private API ---------------------------------------------------------
+
+    def _post_setattr_idle_timeout(self, old, new):
+        """Update the idle timeout of the pool.
+
+        """
+        if self.pool is not None:
+            self.pool.idle_timeout = new
+
 
 class I3pyVisaStarter(I3pyStarter):
     """Starter for VISA based drivers.
 
     """
+    def start(self, driver_cls, connection, settings):
+        """Start the driver and simulate latency for simulated instruments.
+
+        """
+        driver = super().start(driver_cls, connection, settings)
+        infos = _gather_infos(settings)
+        if infos.get('pyvisa_backend') == SIM_BACKEND:
+            add_simulated_latency(driver, infos.get('sim_latency', 0.0),
+                                  infos.get('sim_jitter', 0.0))
+        return driver
+
     def pack_initialize_arguments(self, connection, settings):
         """Pack the arguments in two dict.
 
         For VISA based instruments, the pyvisa backend needs to be extracted
-        from settings and passed outside parameters.
+        from settings and passed outside parameters. For simulated
+        instruments, the backend is built from the instruments description.
 
         """
         kwargs, parameters = super().pack_initialize_arguments(connection,
                                                                settings)
         if 'pyvisa_backend' in parameters:
             kwargs['backend'] = parameters.pop('pyvisa_backend')
+        description = parameters.pop('sim_description', '')
+        parameters.pop('sim_latency', None)
+        parameters.pop('sim_jitter', None)
+        if kwargs.get('backend') == SIM_BACKEND:
+            kwargs['backend'] = build_sim_backend(description)
         return kwargs, parameters
 
 
+def _gather_infos(obj):
+    """Get the infos of a connection or settings as a new dictionary.
+
+    Exopy passes the dictionaries stored in the instrument profiles, but the
+    connection and settings widgets are also accepted.
+
+    """
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    return obj.gather_infos()
+
+
+def _is_pooled(settings):
+    """Whether the settings request the driver to be pooled.
+
+    The value may be a string when read from a profile.
+
+    """
+    return str(_gather_infos(settings).get('pooled', False)) == 'True'
+
+
 # TODO add a special driver for VISA instrument supporting idn to test
 # check_infos
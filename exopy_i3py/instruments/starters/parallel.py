@@ -0,0 +1,144 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Concurrent execution of the start-up of several instruments.
+
+Opening a connection is mostly spent waiting on the instrument, so running
+the start-ups on a pool of threads lets the handshakes overlap.
+
+"""
+import logging
+from collections import deque
+from concurrent.futures import Future, FIRST_COMPLETED, wait
+from threading import Lock, Thread
+from time import monotonic
+from traceback import format_exc
+
+logger = logging.getLogger(__name__)
+
+#: Default maximal number of instruments started at the same time.
+MAX_WORKERS = 8
+
+#: Interval at which jobs not yet started are polled when waiting.
+POLL_INTERVAL = 0.05
+
+
+def run_concurrently(func, jobs, max_workers=None, timeout=None,
+                     on_late=None):
+    """Run a function on several arguments on a bounded pool of threads.
+
+    The jobs are run by daemon threads, so that a job which never completes
+    does not prevent the interpreter from exiting. A job timing out is
+    abandoned and another thread is started to run the remaining jobs.
+
+    Parameters
+    ----------
+    func : callable
+        Function to call on the arguments of each job.
+
+    jobs : dict
+        Mapping between the id of each job and the tuple of arguments to pass
+        to func.
+
+    max_workers : int, optional
+        Maximal number of jobs running at the same time. Defaults to
+        MAX_WORKERS.
+
+    timeout : float, optional
+        Time in seconds allowed to each job, measured from the moment it
+        starts running (and not from its submission). None means no timeout.
+
+    on_late : callable, optional
+        Called with the result of the jobs completing after their timeout
+        expired, which can be used to release the resources they acquired.
+
+    Returns
+    -------
+    results : dict
+        Results of the jobs which succeeded.
+
+    errors : dict
+        Formatted tracebacks of the jobs which failed or timed out.
+
+    """
+    results = {}
+    errors = {}
+    if not jobs:
+        return results, errors
+
+    queue = deque(jobs.items())
+    futures = {Future(): job_id for job_id in jobs}
+    job_futures = {job_id: f for f, job_id in futures.items()}
+    started = {}
+    lock = Lock()
+
+    def work():
+        while True:
+            with lock:
+                if not queue:
+                    return
+                job_id, args = queue.popleft()
+                started[job_id] = monotonic()
+            future = job_futures[job_id]
+            future.set_running_or_notify_cancel()
+            try:
+                result = func(*args)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
+    def start_worker():
+        Thread(target=work, name='exopy_i3py-starter', daemon=True).start()
+
+    def collect_late(job_id, future):
+        if future.exception() is not None:
+            return
+        if on_late is not None:
+            try:
+                on_late(future.result())
+            except Exception:
+                logger.exception('Failed to release late result of %s',
+                                 job_id)
+
+    for _ in range(min(max_workers or MAX_WORKERS, len(jobs))):
+        start_worker()
+
+    pending = set(futures)
+    while pending:
+        wait_time = None
+        if timeout is not None:
+            now = monotonic()
+            with lock:
+                running = [(f, started[futures[f]]) for f in pending
+                           if futures[f] in started]
+            for f, t in running:
+                if now - t >= timeout:
+                    job_id = futures[f]
+                    pending.discard(f)
+                    errors[job_id] = 'Timed out after %s s' % timeout
+                    f.add_done_callback(lambda f, j=job_id: collect_late(j, f))
+                    # The thread running the job is stuck, replace it.
+                    start_worker()
+            if not pending:
+                break
+            remaining = [timeout - (now - t) for f, t in running
+                         if f in pending]
+            wait_time = min(remaining) if remaining else POLL_INTERVAL
+            if len(remaining) < len(pending):
+                wait_time = min(wait_time, POLL_INTERVAL)
+
+        done, pending = wait(pending, wait_time, return_when=FIRST_COMPLETED)
+        for f in done:
+            job_id = futures[f]
+            try:
+                results[job_id] = f.result()
+            except Exception:
+                errors[job_id] = format_exc()
+
+    return results, errors
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Pool keeping initialized drivers alive between measurements.
+
+The idle drivers of all the pools are finalized when the instruments plugin
+is stopped or, failing that, when the interpreter exits.
+
+"""
+import atexit
+import logging
+from threading import Lock, Timer
+from time import monotonic
+from weakref import WeakSet
+
+logger = logging.getLogger(__name__)
+
+#: Pools whose idle drivers should be finalized at exit.
+_POOLS = WeakSet()
+
+
+def make_pool_key(driver_cls, kwargs, parameters):
+    """Build the key identifying the drivers which can be reused.
+
+    Parameters
+    ----------
+    driver_cls : type
+        Class of the driver.
+
+    kwargs : dict
+        Connection arguments passed to the driver.
+
+    parameters : dict
+        Settings passed to the driver.
+
+    """
+    def freeze(d):
+        items = sorted(d.items())
+        try:
+            hash(tuple(items))
+        except TypeError:
+            return repr(items)
+        return tuple(items)
+
+    return driver_cls, freeze(kwargs), freeze(parameters)
+
+
+class DriverPool(object):
+    """Pool of initialized drivers.
+
+    Drivers released to the pool are kept alive until they are acquired again
+    or stay idle for longer than the idle timeout, in which case they are
+    finalized. A single timer is running at any time, set to expire with the
+    oldest idle driver.
+
+    Parameters
+    ----------
+    idle_timeout : float, optional
+        Time in seconds after which an idle driver is finalized.
+
+    health_check : callable, optional
+        Function taking a driver and returning whether it can be reused.
+        Unhealthy drivers are finalized.
+
+    """
+    def __init__(self, idle_timeout=600.0, health_check=None):
+        self.idle_timeout = idle_timeout
+        self.health_check = health_check or default_health_check
+        self._idle = {}
+        self._keys = {}
+        self._lock = Lock()
+        self._timer = None
+        self._closed = False
+        _POOLS.add(self)
+
+    def acquire(self, key):
+        """Get an idle driver matching the key.
+
+        Returns
+        -------
+        driver : object or None
+            Healthy driver or None if no driver is available.
+
+        """
+        self.purge()
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                if not idle:
+                    return None
+                driver, _ = idle.pop()
+            if self.health_check(driver):
+                with self._lock:
+                    self._keys[id(driver)] = key
+                return driver
+            _finalize(driver)
+
+    def register(self, key, driver):
+        """Register a driver created outside the pool so that it can be
+        released to it.
+
+        Drivers registered after the pool was shut down are not managed by
+        it.
+
+        """
+        with self._lock:
+            if not self._closed:
+                self._keys[id(driver)] = key
+
+    def release(self, driver):
+        """Return a driver to the pool.
+
+        Returns
+        -------
+        pooled : bool
+            Whether the driver is managed by the pool. If False, the caller is
+            responsible for finalizing it.
+
+        """
+        with self._lock:
+            key = self._keys.pop(id(driver), None)
+            if key is None or self._closed:
+                return False
+            self._idle.setdefault(key, []).append((driver, monotonic()))
+            self._schedule_purge()
+
+        return True
+
+    def purge(self, all_drivers=False):
+        """Finalize the drivers idle for longer than the timeout.
+
+        Parameters
+        ----------
+        all_drivers : bool, optional
+            Finalize all the idle drivers whatever their idle time.
+
+        """
+        limit = monotonic() - self.idle_timeout
+        expired = []
+        with self._lock:
+            for key, idle in list(self._idle.items()):
+                kept = [(d, t) for d, t in idle
+                        if not all_drivers and t > limit]
+                expired.extend(d for d, t in idle
+                               if all_drivers or t <= limit)
+                if kept:
+                    self._idle[key] = kept
+                else:
+                    del self._idle[key]
+        for driver in expired:
+            _finalize(driver)
+
+    def idle_count(self):
+        """Number of idle drivers in the pool.
+
+        """
+        with self._lock:
+            return sum(len(idle) for idle in self._idle.values())
+
+    def shutdown(self):
+        """Finalize all the idle drivers and stop pooling drivers.
+
+        Drivers in use are no longer managed by the pool and will be
+        finalized when released.
+
+        """
+        with self._lock:
+            self._closed = True
+            self._keys.clear()
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        self.purge(all_drivers=True)
+
+    # --- Private API ---------------------------------------------------------
+
+    def _schedule_purge(self):
+        """Start the timer purging the pool when the oldest idle driver
+        expires.
+
+        Nothing is done if the timer is already running. Must be called with
+        the lock held.
+
+        """
+        if self._timer is not None or self._closed or not self._idle:
+            return
+        oldest = min(t for idle in self._idle.values() for _, t in idle)
+        delay = max(oldest + self.idle_timeout - monotonic(), 0)
+        self._timer = Timer(delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def _on_timer(self):
+        """Purge the pool and wait for the next driver to expire.
+
+        """
+        with self._lock:
+            self._timer = None
+        self.purge()
+        with self._lock:
+            self._schedule_purge()
+
+
+def default_health_check(driver):
+    """Check that a driver is still connected.
+
+    Drivers exposing a connected or initialized attribute are considered
+    healthy if it is True, others are assumed healthy.
+
+    """
+    for attr in ('connected', 'initialized'):
+        try:
+            value = getattr(driver, attr)
+        except AttributeError:
+            continue
+        except Exception:
+            return False
+        return bool(value() if callable(value) else value)
+    return True
+
+
+@atexit.register
+def shutdown_pools():
+    """Finalize the idle drivers of all the pools.
+
+    The pools stop keeping drivers once shut down. Calling this function
+    several times is safe.
+
+    """
+    for pool in list(_POOLS):
+        pool.shutdown()
+
+
+def _finalize(driver):
+    """Finalize a driver ignoring errors.
+
+    """
+    try:
+        driver.finalize()
+    except Exception:
+        logger.exception('Failed to finalize pooled driver %s', driver)
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Tools used to run VISA drivers against simulated instruments.
+
+The simulation relies on the pyvisa-sim backend (@sim).
+
+"""
+import os
+import random
+import tempfile
+from functools import wraps
+from hashlib import sha1
+from time import sleep
+
+#: Name of the simulated backend in pyvisa.
+SIM_BACKEND = '@sim'
+
+#: Methods of message based drivers which are delayed to simulate latency.
+DELAYED_METHODS = ('write', 'read', 'query')
+
+
+def build_sim_backend(description):
+    """Build the pyvisa backend string for a simulated instrument.
+
+    Parameters
+    ----------
+    description : str
+        Either the path to a pyvisa-sim YAML file, an inline YAML description
+        or an empty string to use the default pyvisa-sim instruments.
+
+    Returns
+    -------
+    backend : str
+        String to pass as backend to pyvisa.
+
+    """
+    description = description.strip()
+    if not description:
+        return SIM_BACKEND
+
+    if '\n' not in description:
+        return description + SIM_BACKEND
+
+    # Inline descriptions are written to a file named after their content so
+    # that restarting the same driver does not create new files.
+    digest = sha1(description.encode('utf-8')).hexdigest()
+    path = os.path.join(tempfile.gettempdir(),
+                        'exopy_i3py_sim_%s.yaml' % digest)
+    if not os.path.isfile(path):
+        with open(path, 'w') as f:
+            f.write(description)
+    return path + SIM_BACKEND
+
+
+def add_simulated_latency(driver, latency, jitter=0.0):
+    """Delay the communications of a driver.
+
+    Each call to the write, read and query methods of the driver is delayed by
+    latency plus a random delay uniformly distributed in [-jitter, jitter].
+
+    Parameters
+    ----------
+    driver :
+        Message based driver (instance) whose communications to delay.
+
+    latency : float
+        Mean delay in seconds.
+
+    jitter : float, optional
+        Maximal deviation of the delay from the mean in seconds.
+
+    """
+    if not latency and not jitter:
+        return
+
+    def delayed(method):
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            delay = latency + random.uniform(-jitter, jitter)
+            if delay > 0:
+                sleep(delay)
+            return method(*args, **kwargs)
+        return wrapper
+
+    for name in DELAYED_METHODS:
+        method = getattr(driver, name, None)
+        if method is not None:
+            # Wrap the original method so that starting a pooled driver
+            # again does not accumulate delays.
+            method = getattr(method, '__wrapped__', method)
+            setattr(driver, name, delayed(method))
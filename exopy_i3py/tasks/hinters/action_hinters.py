@@ -12,20 +12,232 @@ Those should do their job well if the action are annotated with easy to
 understand types. The main issue will probably be with structured array as
 output.
 
+The return annotation of an action can be:
+
+- a scalar type (float, int, bool, str, numpy scalar type)
+- anything numpy understands as a dtype (including structured dtypes
+  declared as a list of (name, type) pairs) in which case a 0d array is used
+- an ArrayHint specifying the dtype and shape of an array, the dimensions of
+  the shape being either integers or names of arguments of the action
+- a tuple (or typing.Tuple) of the above if the action returns several values
+
+The arrays used as hints are read-only broadcast views of a single element, so
+that they do not allocate memory whatever their shape.
+
 """
+import ast
+from inspect import signature, Parameter
+
+import numpy as np
+
+from ..instructions.capabilities import get_capabilities
 from .base_hinters import BaseInstructionReturnHinter
+from .feature_hinters import RegisterHinter, WithUnitHinter
+
+
+class ArrayHint(object):
+    """Annotation describing an array returned by an action.
+
+    Parameters
+    ----------
+    dtype :
+        Data type of the array (anything accepted by numpy.dtype).
+
+    shape : tuple
+        Shape of the array. Each dimension can be an int or the name of an
+        argument of the action giving the dimension.
+
+    """
+    __slots__ = ('dtype', 'shape')
+
+    def __init__(self, dtype, shape=()):
+        self.dtype = np.dtype(dtype)
+        self.shape = shape if isinstance(shape, tuple) else (shape,)
 
 
-# TODO implement
 class ActionSignatureHinter(BaseInstructionReturnHinter):
     """Hinter relying on the Action signature nd modifiers to make a guess.
 
     """
-    pass
+    @classmethod
+    def rate_hint_pertinence(cls, instruction, driver):
+        """Pertinent for annotated actions.
+
+        """
+        func = _action_function(instruction, driver)
+        if func is None:
+            return 0
+        return 2 if _return_annotation(func) is not None else 1
+
+    def cache_key(self, instruction):
+        """The shape of the arrays depend on the arguments of the action.
+
+        """
+        return (type(instruction),
+                tuple(getattr(instruction, 'action_kwargs', {}).items()),
+                tuple(getattr(instruction, 'ret_names', ())))
+
+    def guess_value(self, instruction, driver):
+        """Build placeholders from the return annotation of the action.
+
+        """
+        func = _action_function(instruction, driver)
+        if func is None:
+            return None
+        annotation = _return_annotation(func)
+        if annotation is None:
+            return None
+
+        arguments = _arguments(func, getattr(instruction, 'action_kwargs', {}))
+        value = _placeholder(annotation, arguments)
+
+        # Return units are the last element of the units modifier.
+        units = _creation_kwargs(instruction, driver).get('units')
+        if units:
+            ret_unit = units[-1]
+            if isinstance(value, tuple) and isinstance(ret_unit, tuple):
+                value = tuple(WithUnitHinter.add_unit(v, u) if u else v
+                              for v, u in zip(value, ret_unit))
+            elif isinstance(ret_unit, str):
+                value = WithUnitHinter.add_unit(value, ret_unit)
+        return value
+
+    def map_hint(self, instruction, value):
+        """Distribute the values returned by the action on the entries.
+
+        """
+        ret_names = getattr(instruction, 'ret_names', ())
+        if (ret_names and isinstance(value, tuple) and
+                len(value) == len(ret_names)):
+            return {instruction.id + '_' + n: v
+                    for n, v in zip(ret_names, value)}
+        return super(ActionSignatureHinter, self).map_hint(instruction, value)
 
 
 class RegisterActionHinter(BaseInstructionReturnHinter):
     """Hinter specialized for RegisterAction.
 
     """
-    pass
+    @classmethod
+    def rate_hint_pertinence(cls, instruction, driver):
+        """Pertinent for RegisterAction.
+
+        """
+        node = _action_node(instruction, driver)
+        if node is None:
+            return 0
+        return 3 if any(c.__name__ == 'RegisterAction'
+                        for c in type(node.obj).__mro__) else 0
+
+    def guess_value(self, instruction, driver):
+        """Build an empty flag from the register bits names.
+
+        """
+        node = _action_node(instruction, driver)
+        if node is None:
+            return None
+        names = _creation_kwargs(instruction, driver).get('names')
+        return RegisterHinter.build_flag(node.name, names)
+
+
+def _action_node(instruction, driver):
+    """Get the node describing the Action pointed by an instruction.
+
+    """
+    node = get_capabilities(driver).lookup(instruction.path)
+    return node if node is not None and node.kind == 'action' else None
+
+
+def _creation_kwargs(instruction, driver):
+    """Get the creation kwargs of the Action pointed by an instruction.
+
+    """
+    node = _action_node(instruction, driver)
+    if node is None:
+        return {}
+    return getattr(node.obj, 'creation_kwargs', None) or {}
+
+
+def _action_function(instruction, driver):
+    """Get the function wrapped by the Action pointed by an instruction.
+
+    """
+    node = _action_node(instruction, driver)
+    if node is None:
+        return None
+    obj = node.obj
+    for attr in ('func', '__wrapped__'):
+        if callable(getattr(obj, attr, None)):
+            return getattr(obj, attr)
+    return obj if callable(obj) else None
+
+
+def _return_annotation(func):
+    """Get the return annotation of a function, None if absent.
+
+    """
+    try:
+        ann = signature(func).return_annotation
+    except (TypeError, ValueError):
+        return None
+    return None if ann is Parameter.empty else ann
+
+
+def _arguments(func, action_kwargs):
+    """Collect the values of the arguments known statically.
+
+    The values passed by the instruction are used if they are literals,
+    otherwise the defaults of the signature.
+
+    """
+    arguments = {}
+    try:
+        params = signature(func).parameters
+    except (TypeError, ValueError):
+        params = {}
+    for name, p in params.items():
+        if p.default is not Parameter.empty:
+            arguments[name] = p.default
+    for name, formula in action_kwargs.items():
+        try:
+            arguments[name] = ast.literal_eval(formula)
+        except (ValueError, SyntaxError):
+            pass
+    return arguments
+
+
+def _placeholder(annotation, arguments):
+    """Build the placeholder matching an annotation.
+
+    """
+    # Several return values.
+    args = getattr(annotation, '__args__', None)
+    if getattr(annotation, '__origin__', None) is tuple and args:
+        return tuple(_placeholder(a, arguments) for a in args)
+    if isinstance(annotation, tuple):
+        return tuple(_placeholder(a, arguments) for a in annotation)
+
+    if isinstance(annotation, ArrayHint):
+        shape = tuple(_dimension(d, arguments) for d in annotation.shape)
+        return np.broadcast_to(np.zeros((), annotation.dtype), shape)
+
+    if annotation in (float, int, bool, str, complex):
+        return annotation()
+
+    try:
+        dtype = np.dtype(annotation)
+    except TypeError:
+        return None
+    return np.zeros((), dtype) if dtype.names else dtype.type()
+
+
+def _dimension(dim, arguments):
+    """Resolve a dimension of a shape.
+
+    """
+    if isinstance(dim, str):
+        dim = arguments.get(dim, 1)
+    try:
+        return max(int(dim), 0)
+    except (TypeError, ValueError):
+        return 1
@@ -21,6 +21,8 @@ from atom.api import Constant
 
 from exopy.utils.atom_util import HasPrefsAtom
 
+from .hint_cache import get_hint, set_hint, _MISSING
+
 
 #: Dependency type id
 DEP_TYPE = 'exopy_i3py.tasks.hinters'
@@ -64,14 +66,27 @@ class BaseInstructionReturnHinter(HasPrefsAtom):
     def guess_value(self, instruction, driver):
         """Guess a reasonable hint value based on the driver introspection.
 
+        Returning None means that no guess can be made, in which case the
+        guessed_value member is used.
+
         """
         pass
 
+    def cache_key(self, instruction):
+        """Key identifying the hints of this hinter for an instruction.
+
+        The hints are cached by hinter class, driver class, path and user
+        value. Hinters whose guess depends on other preferences (of the
+        hinter or the instruction) should include them in the key.
+
+        """
+        return type(instruction)
+
     def provide_hint(self, instruction, driver_cls, task):
         """By default simply provide the user value of the guessed one.
 
-        This method assumes the instruction writes a single value in the
-        database.
+        The same value is used for all the database entries of the
+        instruction. The value is cached unless it depends on the database.
 
         Parameters
         ----------
@@ -91,11 +106,29 @@ class BaseInstructionReturnHinter(HasPrefsAtom):
             instruction.
 
         """
-        if self.user_value:
+        if '{' in self.user_value:
             val = task.format_and_eval_string(self.user_value)
         else:
-            val = self.guessed_value
-        return {instruction.database_entries.keys()[0]: val}
+            key = (type(self), instruction.path, self.user_value,
+                   self.cache_key(instruction))
+            val = get_hint(driver_cls, key)
+            if val is _MISSING:
+                if self.user_value:
+                    val = task.format_and_eval_string(self.user_value)
+                else:
+                    val = self.guess_value(instruction, driver_cls)
+                set_hint(driver_cls, key, val)
+            if val is None:
+                val = self.guessed_value
+        return self.map_hint(instruction, val)
+
+    def map_hint(self, instruction, value):
+        """Build the hints of the database entries from the hint value.
+
+        By default the same value is used for all entries.
+
+        """
+        return {k: value for k in instruction.database_entries}
 
     # --- Private API ---------------------------------------------------------
 
@@ -11,53 +11,282 @@
 Those should do their job in most cases (at least as long as the driver does
 not do some crazy modification to the return value)
 
+The hints are derived only from the Features declarations (creation kwargs),
+so that no connection to the instrument is required.
+
 """
+from enum import IntFlag
+
+from ..instructions.capabilities import get_capabilities
 from .base_hinters import BaseInstructionReturnHinter
 
+try:
+    from i3py.core import unit as i3py_unit
+except ImportError:  # pragma: no cover
+    i3py_unit = None
 
-# TODO implement
-class FeatureHinter():
+
+class FeatureHinter(BaseInstructionReturnHinter):
     """Base Feature hinter guessing what it can from the creation kwargs.
 
     """
-    pass
+    @classmethod
+    def rate_hint_pertinence(cls, instruction, driver):
+        """Rate the hinter based on the Feature pointed by the instruction.
+
+        """
+        node = _feature_node(instruction, driver)
+        return cls.rate_feature(node) if node is not None else 0
+
+    @classmethod
+    def rate_feature(cls, node):
+        """Rate the pertinence of the hinter for a Feature.
+
+        Parameters
+        ----------
+        node : exopy_i3py.tasks.instructions.capabilities.CapabilityNode
+            Node of the capability index describing the Feature.
+
+        """
+        return 1
+
+    def guess_value(self, instruction, driver):
+        """Guess the value based on the Feature declaration.
 
+        """
+        node = _feature_node(instruction, driver)
+        return self.guess_feature(node) if node is not None else None
 
-class EnumeratedFeatureHinter():
+    def guess_feature(self, node):
+        """Guess a value for a Feature.
+
+        The base implementation returns the default value of the Feature
+        type.
+
+        """
+        return node.value_type() if node.value_type is not None else None
+
+
+class EnumeratedFeatureHinter(FeatureHinter):
     """Provide hints for Feature with a discrete set of allowed values.
 
     """
-    pass
+    @classmethod
+    def rate_feature(cls, node):
+        """Pertinent for Features declaring their values.
+
+        """
+        return 2 if node.values else 0
+
+    def guess_feature(self, node):
+        """Use the first allowed value.
+
+        """
+        if not node.values:
+            return super(EnumeratedFeatureHinter, self).guess_feature(node)
+        return node.values[0]
 
 
-class LimitsValidatedHinter():
+class LimitsValidatedHinter(FeatureHinter):
     """Provide hints for Feature limit handling.
 
     Note that if the limit is dynamic in nature, we may not be able to give a
     reasonable value.
 
     """
-    pass
+    @classmethod
+    def rate_feature(cls, node):
+        """Pertinent for Features with static limits.
 
+        """
+        return 2 if _static_limits(node) is not None else 0
 
-class WithUnitHinter():
+    def guess_feature(self, node):
+        """Use the minimum (or maximum) of the limits.
+
+        """
+        limits = _static_limits(node)
+        value = None
+        if limits is not None:
+            value = limits[0] if limits[0] is not None else limits[1]
+        if value is None:
+            return super(LimitsValidatedHinter, self).guess_feature(node)
+        return node.value_type(value) if node.value_type else value
+
+
+class WithUnitHinter(LimitsValidatedHinter):
     """Hinter handling float with units.
 
     """
-    pass
+    @classmethod
+    def rate_feature(cls, node):
+        """Pertinent for Features declaring a unit.
+
+        """
+        return 3 if node.unit else 0
+
+    def guess_feature(self, node):
+        """Return a quantity if I3py returns quantities, a float otherwise.
+
+        """
+        value = super(WithUnitHinter, self).guess_feature(node)
+        if value is None:
+            value = 0.0
+        return self.add_unit(float(value), node.unit)
+
+    @staticmethod
+    def add_unit(value, unit):
+        """Attach a unit to a value if I3py returns quantities.
+
+        """
+        if (i3py_unit is not None and
+                getattr(i3py_unit, 'UNIT_SUPPORT', False) and
+                getattr(i3py_unit, 'UNIT_RETURN', True)):
+            ureg = i3py_unit.get_unit_registry()
+            return ureg.Quantity(value, unit)
+        return value
 
 
-class RegisterHinter():
+class RegisterHinter(FeatureHinter):
     """Hinter specialized in handling Register features.
 
     """
-    pass
+    @classmethod
+    def rate_feature(cls, node):
+        """Pertinent for Register Features.
+
+        """
+        return 3 if _is_a(node.obj, 'Register') else 0
+
+    def guess_feature(self, node):
+        """Build an empty flag whose members are the register bits names.
+
+        """
+        kwargs = getattr(node.obj, 'creation_kwargs', None) or {}
+        return self.build_flag(node.name, kwargs.get('names'))
+
+    @staticmethod
+    def build_flag(name, names):
+        """Build an empty flag from the names of the bits of a register.
+
+        Parameters
+        ----------
+        name : str
+            Name of the flag class.
+
+        names : list or dict or None
+            Names of the bits ordered by bit index (None for unnamed bits) or
+            mapping between names and bit indexes.
+
+        """
+        names = names or ()
+        if isinstance(names, dict):
+            bits = [(n, 1 << b) for n, b in names.items() if n]
+        else:
+            bits = [(n, 1 << i) for i, n in enumerate(names) if n]
+        if not bits:
+            return 0
+        return IntFlag(name, bits)(0)
 
 
-# TODO this one is more work bacause it has a nested hinter.
-# TODO requires also a more complex selection logic
-class AliasHinter():
+class AliasHinter(FeatureHinter):
     """Hinter specialized in handling Alias features.
 
+    The target of the alias is resolved in the capability index and the most
+    pertinent hinter for the target is used.
+
+    """
+    @classmethod
+    def rate_feature(cls, node):
+        """Pertinent for Alias Features.
+
+        """
+        return 3 if _alias_target(node) else 0
+
+    def guess_value(self, instruction, driver):
+        """Guess the value of the target of the alias.
+
+        """
+        node = _feature_node(instruction, driver)
+        if node is None:
+            return None
+        # Resolve chains of aliases, protecting against cycles.
+        seen = set()
+        index = get_capabilities(driver)
+        path = instruction.path
+        while _alias_target(node) and node not in seen:
+            seen.add(node)
+            node = index.lookup(_resolve_alias(path, node))
+            if node is None or node.kind != 'feature':
+                return None
+            path = node.path
+
+        hinter_cls = max((h for h in FEATURE_HINTERS if h is not AliasHinter),
+                         key=lambda h: h.rate_feature(node))
+        return hinter_cls().guess_feature(node)
+
+
+#: Feature hinters from the most generic to the most specialized.
+FEATURE_HINTERS = (FeatureHinter, EnumeratedFeatureHinter,
+                   LimitsValidatedHinter, WithUnitHinter, RegisterHinter,
+                   AliasHinter)
+
+
+def _feature_node(instruction, driver):
+    """Get the node describing the Feature pointed by an instruction.
+
+    """
+    node = get_capabilities(driver).lookup(instruction.path)
+    return node if node is not None and node.kind == 'feature' else None
+
+
+def _is_a(obj, cls_name):
+    """Check whether an object is an instance of a class identified by name.
+
+    """
+    return any(c.__name__ == cls_name for c in type(obj).__mro__)
+
+
+def _static_limits(node):
+    """Extract (minimum, maximum) from static limits.
+
+    Limits referred to by name are dynamic and cannot be used.
+
+    """
+    limits = node.limits
+    if limits is None or isinstance(limits, str):
+        return None
+    if isinstance(limits, (tuple, list)):
+        if len(limits) == 1:
+            return None, limits[0]
+        return limits[0], limits[1]
+    if hasattr(limits, 'minimum') or hasattr(limits, 'maximum'):
+        return (getattr(limits, 'minimum', None),
+                getattr(limits, 'maximum', None))
+    return None
+
+
+def _alias_target(node):
+    """Get the path of the target of an Alias Feature.
+
+    """
+    if not _is_a(node.obj, 'Alias'):
+        return None
+    kwargs = getattr(node.obj, 'creation_kwargs', None) or {}
+    return kwargs.get('alias')
+
+
+def _resolve_alias(path, node):
+    """Compute the path of the target of an alias.
+
+    Leading dots in the alias are used to access the parents of the object
+    owning the alias.
+
     """
-    pass
+    alias = _alias_target(node)
+    stripped = alias.lstrip('.')
+    parts = path.split('.')[:-1]
+    ups = len(alias) - len(stripped)
+    if ups:
+        parts = parts[:-ups] if ups < len(parts) else parts[:1]
+    return '.'.join(parts + [stripped])
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by Exopy-I3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Cache of the values provided by the hinters during the checks.
+
+The values are cached per driver class and keyed by the hinter class, the path
+of the instruction, the user value and an additional key provided by the
+hinter reflecting its other preferences. Changing any of those results in a
+different key, so that no explicit invalidation is needed when editing an
+instruction. As the values stored under the previous keys are never requested
+again, each cache only keeps the HINT_CACHE_SIZE most recently used hints. The
+caches being keyed by weak references on the driver classes they disappear
+with the classes.
+
+"""
+from collections import OrderedDict
+from weakref import WeakKeyDictionary
+
+#: Maximal number of hints cached for each driver class.
+HINT_CACHE_SIZE = 512
+
+#: Cached hints for each driver class, ordered from the least to the most
+#: recently used.
+_HINT_CACHES = WeakKeyDictionary()
+
+#: Number of hints served from the cache and computed.
+_STATS = {'hits': 0, 'misses': 0}
+
+#: Marker for missing values.
+_MISSING = object()
+
+
+def get_hint(driver_cls, key):
+    """Get a cached hint.
+
+    Returns
+    -------
+    value :
+        Cached value or the module level _MISSING marker.
+
+    """
+    try:
+        cache = _HINT_CACHES[driver_cls]
+        value = cache[key]
+    except (KeyError, TypeError):
+        value = _MISSING
+    else:
+        cache.move_to_end(key)
+    _STATS['misses' if value is _MISSING else 'hits'] += 1
+    return value
+
+
+def set_hint(driver_cls, key, value):
+    """Cache a hint.
+
+    The least recently used hint of the driver class is discarded if the
+    cache is full.
+
+    """
+    try:
+        cache = _HINT_CACHES[driver_cls]
+    except KeyError:
+        cache = _HINT_CACHES.setdefault(driver_cls, OrderedDict())
+    except TypeError:
+        # Not weak referenceable, do not cache.
+        return
+    try:
+        cache[key] = value
+    except TypeError:
+        # Unhashable key, do not cache.
+        return
+    cache.move_to_end(key)
+    if len(cache) > HINT_CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+def hint_cache_info():
+    """Get statistics about the hint cache.
+
+    """
+    return {'hits': _STATS['hits'], 'misses': _STATS['misses'],
+            'size': sum(len(c) for c in _HINT_CACHES.values())}
+
+
+def clear_hint_cache(driver_cls=None):
+    """Discard the cached hints.
+
+    Parameters
+    ----------
+    driver_cls : type, optional
+        Driver class whose hints should be discarded. If None, the hints of
+        all classes are discarded.
+
+    """
+    if driver_cls is None:
+        _HINT_CACHES.clear()
+    else:
+        _HINT_CACHES.pop(driver_cls, None)
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by Exopy-I3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Generation of the functions used by instructions to access the driver.
+
+The generated functions only depend on the kind of access, the path and the
+names of the channel ids, so they are cached and shared between all the
+instructions of the process.
+
+The objects (channels, subsystems) resolved from a driver can also be cached
+for the lifetime of the driver connection. The starters are responsible for
+clearing those caches when the connection is closed or reset.
+
+"""
+from functools import lru_cache
+from weakref import WeakKeyDictionary
+
+#: Source templates of the accessors for each kind of instruction.
+ACCESSOR_TEMPLATES = {
+    'get': ("def _get_(driver, {ch_ids}):\n"
+            "    return {path}"),
+    'set': ("def _set_(driver, value, {ch_ids}):\n"
+            "    {path} = value"),
+    'call': ("def _call_(driver, kwargs, {ch_ids}):\n"
+             "    return {path}(**kwargs)"),
+}
+
+#: Maximal number of accessors kept in the cache.
+ACCESSOR_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=ACCESSOR_CACHE_SIZE)
+def _build_accessor(kind, path, ch_ids):
+    """Generate the accessor function (cached).
+
+    """
+    source = ACCESSOR_TEMPLATES[kind].format(ch_ids=', '.join(ch_ids),
+                                             path=path)
+    local = {}
+    exec(source, local)
+    return local['_%s_' % kind]
+
+
+def build_accessor(kind, path, ch_ids):
+    """Get the function accessing the target of an instruction.
+
+    Parameters
+    ----------
+    kind : {'get', 'set', 'call'}
+        Kind of access to perform.
+
+    path : str
+        Path of the instruction, starting with driver.
+
+    ch_ids : iterable
+        Names of the channel ids appearing in the path. The accessor expects
+        their values to be passed as keyword arguments.
+
+    Returns
+    -------
+    accessor : callable
+        Function whose signature depends on the kind of access:
+        - get: (driver, **ch_ids)
+        - set: (driver, value, **ch_ids)
+        - call: (driver, kwargs, **ch_ids)
+
+    """
+    return _build_accessor(kind, path, tuple(sorted(ch_ids)))
+
+
+def accessor_cache_info():
+    """Get statistics about the accessor cache.
+
+    """
+    return _build_accessor.cache_info()
+
+
+def clear_accessor_cache():
+    """Discard all the cached accessors.
+
+    """
+    _build_accessor.cache_clear()
+
+
+#: Caches of the objects resolved from each driver.
+_RESOLUTION_CACHES = WeakKeyDictionary()
+
+
+def get_resolution_cache(driver):
+    """Get the cache of the objects resolved from a driver.
+
+    The cache is a dictionary whose keys are (path, channel ids items)
+    tuples and which is shared by all instructions working with the driver.
+
+    Raises
+    ------
+    TypeError :
+        Raised if the driver cannot be weakly referenced.
+
+    """
+    try:
+        return _RESOLUTION_CACHES[driver]
+    except KeyError:
+        return _RESOLUTION_CACHES.setdefault(driver, {})
+
+
+def clear_resolution_cache(driver):
+    """Discard all the objects resolved from a driver.
+
+    This should be called each time the connection of the driver is closed or
+    reset.
+
+    """
+    cache = _RESOLUTION_CACHES.get(driver)
+    if cache:
+        cache.clear()
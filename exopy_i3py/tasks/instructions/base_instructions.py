@@ -9,16 +9,23 @@
 """Basic instruction used to define the operations to execute on a driver.
 
 """
+from math import isclose
+from numbers import Real
+from sys import intern
 from traceback import format_exc
 from collections import OrderedDict
 
-from atom.api import (Typed, List, Dict, Str, Callable, Constant)
+from atom.api import (Typed, List, Dict, Str, Callable, Constant, Tuple,
+                      Bool, Float, Int)
 
 from exopy.utils.atom_util import (HasPrefsAtom, ordered_dict_to_pref,
                                    ordered_dict_from_pref)
 
 from ..hinters.base_hinters import (BaseInstructionReturnHinter,
                                     DEP_TYPE as HINTER_DEP_TYPE)
+from .expressions import CompiledExpression, compile_expression
+from .metadata import InstructionMetadata, get_metadata
+from .validation import check_path
 
 #: Dependency type id
 DEP_TYPE = 'exopy_i3py.tasks.instructions'
@@ -54,6 +61,13 @@ class BaseInstruction(HasPrefsAtom):
     #: Names under which the instruction ouput should be stored in the database
     database_entries = Dict()
 
+    #: Group to which the instruction belongs when the task executes its
+    #: instructions in parallel. Consecutive instructions tagged with
+    #: different groups are assumed to be independent and are executed
+    #: concurrently. Untagged instructions are executed in the order of the
+    #: list, after all the previous instructions completed.
+    parallel_group = Str().tag(pref=True)
+
     def check(self, task, driver_cls):
         """Ensure that the path is meaningful and check the hinter.
 
@@ -75,26 +89,11 @@ class BaseInstruction(HasPrefsAtom):
             succeeded or an error message if something went wrong.
 
         """
-        dr = driver_cls
-        valid_path = driver_cls.__name__
-        for i, part in enumerate(self.path.split('.')):
-            if i == 0 and part != 'driver':
-                return (False,
-                        'The path of the instruction should start by "driver"')
-            if '[' in part:
-                if ']' not in part:
-                    return False, 'Malformed channel access: %s' % part
-                ch_id = part.split('[')[1].split(']')[0]
-                if ch_id not in self.ch_ids:
-                    return (False,
-                            'Unknown channel id %s, know ids are %s' %
-                            (ch_id, self.ch_ids))
-                part = part.split('[')[0]
-
-            if not hasattr(dr, part):
-                return False, '%s has no attribute %s' % (valid_path, part)
-
-            dr = getattr(dr, part)
+        # The channel ids may have been edited in place.
+        self._meta = get_metadata(self.path, self.ch_ids)
+        test, msg = self._check_path(self.path, driver_cls)
+        if not test:
+            return test, msg
 
         try:
             value = self.hinter.provide_hint(self, driver_cls, task)
@@ -108,37 +107,202 @@ class BaseInstruction(HasPrefsAtom):
     def prepare(self):
         """Prepare the instruction for execution.
 
-        Called once in the lifetime, before execute.
+        Called once in the lifetime, before execute. The base implementation
+        compiles the channel ids expressions and builds the function resolving
+        the object owning the target of the path, subclasses should call it.
 
         """
-        raise NotImplementedError
+        # Sorting ensures that the cache keys built from the channel ids values
+        # do not depend on the order in which they were declared.
+        self._ch_ids_exprs = tuple((k, compile_expression(v))
+                                   for k, v in sorted(self.ch_ids.items()))
+        # The static parts (paths, accessors) are shared between all the
+        # instructions using the same path. They are attached when the path
+        # or the channel ids are set but the channel ids may have been edited
+        # in place.
+        self._meta = get_metadata(self.path, self.ch_ids)
 
     def execute(self, task, driver):
         """Execute the instruction on the provided driver.
 
+        The execution is split in three phases: evaluation of the expressions,
+        access to the driver and storage of the result in the database.
+
+        """
+        self.store(task, self.access(task, driver, self.evaluate(task)))
+
+    def evaluate(self, task):
+        """Evaluate the expressions needed to access the driver.
+
+        By default only the channel ids are evaluated.
+
+        Returns
+        -------
+        evaluated :
+            Object passed to access.
+
+        """
+        return self._eval_ch_ids(task)
+
+    def access(self, task, driver, evaluated):
+        """Access the driver (get, set, call).
+
+        Parameters
+        ----------
+        task : exopy_i3py.tasks.tasks.generic_instr_task.GenericI3pyTask
+            Task to which this instruction is attached.
+
+        driver :
+            Driver on which to operate.
+
+        evaluated :
+            Result of evaluate.
+
+        Returns
+        -------
+        result :
+            Object passed to store.
+
         """
         raise NotImplementedError
 
+    def store(self, task, result):
+        """Store the result of the access in the database.
+
+        By default nothing is stored.
+
+        """
+        pass
+
+    def generate_source(self, compiler):
+        """Contribute the instruction to a fused perform function.
+
+        By default the execute method of the instruction is simply called.
+
+        Parameters
+        ----------
+        compiler : exopy_i3py.tasks.instructions.compiler.PerformCompiler
+            Compiler generating the function.
+
+        """
+        compiler.fallback(self)
+
+    def preferences_from_members(self):
+        """Get the members values as string to store them in .ini files.
+
+        The preferences of the hinter are stored under the 'hinter' key.
+
+        """
+        prefs = super(BaseInstruction, self).preferences_from_members()
+        if self.hinter is not None:
+            prefs['hinter'] = self.hinter.preferences_from_members()
+        return prefs
+
+    @classmethod
     def build_from_config(cls, config, dependencies):
         """Build an instruction from a config.
 
         """
         inst = cls()
         inst.update_members_from_preferences(config)
-        hinter_id = config['hinter']['hinter_id']
-        hinter_cls = dependencies[HINTER_DEP_TYPE][hinter_id]
-        inst.hinter = hinter_cls.build_from_config(config['hinter'],
-                                                   dependencies)
+        if 'hinter' in config:
+            hinter_id = config['hinter']['hinter_id']
+            hinter_cls = dependencies[HINTER_DEP_TYPE][hinter_id]
+            inst.hinter = hinter_cls.build_from_config(config['hinter'],
+                                                       dependencies)
         return inst
 
     # --- Private API ---------------------------------------------------------
 
+    #: Pairs of channel id names and compiled expressions used to compute
+    #: their values at runtime.
+    _ch_ids_exprs = Tuple()
+
+    #: Metadata shared by the instructions using the same path (accessors
+    #: and resolution cache).
+    _meta = Typed(InstructionMetadata)
+
+    def _check_path(self, path, driver_cls):
+        """Check that a path can be accessed on a driver class.
+
+        The result is memoized per driver class, path and channel ids names.
+
+        Returns
+        -------
+        test : bool
+            Whether or not the path is valid.
+
+        msg : str
+            Error message explaining why the path is invalid.
+
+        """
+        return check_path(path, driver_cls, self.ch_ids)
+
+    def _eval_ch_ids(self, task):
+        """Evaluate the channel ids using the precompiled expressions.
+
+        """
+        return {k: expr(task) for k, expr in self._ch_ids_exprs}
+
+    def _resolve_parent(self, driver, ch_ids):
+        """Get the object owning the target of the instruction.
+
+        The object is cached for each set of channel ids values as long as
+        the driver connection is not closed or reset.
+
+        """
+        meta = self._meta
+        return self._resolve(driver, ch_ids, meta.parent_path,
+                             meta.parent_resolver())
+
+    def _resolve(self, driver, ch_ids, path, resolver):
+        """Get an object from the driver using the resolution cache.
+
+        The cache is keyed by the path and the names and values of the
+        channel ids, so that instructions using the same path with different
+        channel ids names do not share entries.
+
+        """
+        # Drivers which cannot be weakly referenced are not cached.
+        cache = self._meta.resolution_cache(driver)
+        if cache is None:
+            return resolver(driver, **ch_ids)
+
+        try:
+            key = (path, tuple(ch_ids.items()))
+            return cache[key]
+        except KeyError:
+            obj = resolver(driver, **ch_ids)
+            cache[key] = obj
+            return obj
+        except TypeError:
+            # Unhashable channel ids cannot be cached.
+            return resolver(driver, **ch_ids)
+
     def _default_instruction_id(self):
         """Default value for the instruction_id member.
 
         """
         pack, _ = self.__module__.split('.', 1)
-        return pack + '.' + type(self).__name__
+        return intern(pack + '.' + type(self).__name__)
+
+    def _post_validate_path(self, old, new):
+        """Intern the path as many instructions share the same.
+
+        """
+        return intern(new)
+
+    def _post_setattr_path(self, old, new):
+        """Attach the metadata shared by the instructions using the path.
+
+        """
+        self._meta = get_metadata(new, self.ch_ids)
+
+    def _post_setattr_ch_ids(self, old, new):
+        """Attach the metadata matching the new channel ids names.
+
+        """
+        self._meta = get_metadata(self.path, new)
 
 
 class GetInstruction(BaseInstruction):
@@ -149,20 +313,28 @@ class GetInstruction(BaseInstruction):
         """Build the callable accessing driver Feature.
 
         """
-        source = (
-            "def _get_(driver, **ch_ids):"
-            "    return {path}")
-        local = {}
-        exec(source.format(', '.join(self.ch_ids), self.path), local)
-        self._getter = local['_get_']
+        super(GetInstruction, self).prepare()
+        self._getter = self._meta.accessor('get')
 
-    def execute(self, task, driver):
-        """Get the value of the Feature and store it in the database.
+    def access(self, task, driver, ch_ids):
+        """Get the value of the Feature.
+
+        """
+        return self._getter(self._resolve_parent(driver, ch_ids), **ch_ids)
+
+    def store(self, task, value):
+        """Store the value of the Feature in the database.
+
+        """
+        task.write_in_database(self.id, value)
+
+    def generate_source(self, compiler):
+        """Read the Feature and write it in the database.
 
         """
-        ch_ids = {k: task.format_and_eval_string(v)
-                  for k, v in self.ch_ids.items()}
-        task.write_in_database(self.id, self._getter(driver, **ch_ids))
+        parent, access = compiler.access(self.path, self._ch_ids_exprs)
+        compiler.emit('write(%r, %s%s)' % (self.id, parent, access))
+        compiler.written((self.id,))
 
     # --- Private API ---------------------------------------------------------
 
@@ -184,25 +356,58 @@ class SetInstruction(BaseInstruction):
     #: Value that should be set when executing the instruction.
     value = Str().tag(pref=True)
 
+    #: Whether to skip the set when the driver cache indicates that the
+    #: instrument already holds the value.
+    skip_unchanged = Bool().tag(pref=True)
+
+    #: Absolute tolerance used to compare real values to the cached one.
+    abs_tol = Float().tag(pref=True)
+
+    #: Relative tolerance used to compare real values to the cached one.
+    rel_tol = Float().tag(pref=True)
+
+    #: Number of sets skipped since the instruction was last prepared.
+    skipped_writes = Int()
+
     def prepare(self):
         """Build the callable accessing driver Feature.
 
         """
-        source = (
-            "def _set_(driver, value, **ch_ids):"
-            "    {path} = value")
-        local = {}
-        exec(source.format(', '.join(self.ch_ids), self.path), local)
-        self._setter = local['_set_']
+        super(SetInstruction, self).prepare()
+        self._value_expr = compile_expression(self.value)
+        self._setter = self._meta.accessor('set')
+        target = self._meta.target_path.split('.', 1)[1]
+        self._feature_name = target if '[' not in target else ''
+        self.skipped_writes = 0
 
-    def execute(self, task, driver):
-        """Get the value of the Feature and store it in the database.
+    def evaluate(self, task):
+        """Evaluate the channel ids and the value to set.
 
         """
-        ch_ids = {k: task.format_and_eval_string(v)
-                  for k, v in self.ch_ids.items()}
-        value = task.format_and_eval_string(self.value)
-        self._setter(driver, value, **ch_ids)
+        return self._eval_ch_ids(task), self._value_expr(task)
+
+    def access(self, task, driver, evaluated):
+        """Set the value of the Feature.
+
+        """
+        ch_ids, value = evaluated
+        parent = self._resolve_parent(driver, ch_ids)
+        if self.skip_unchanged and self._is_cached(parent, value):
+            self.skipped_writes += 1
+            return
+        self._setter(parent, value, **ch_ids)
+
+    def generate_source(self, compiler):
+        """Assign the value to the Feature.
+
+        """
+        if self.skip_unchanged:
+            compiler.fallback(self)
+            return
+
+        parent, access = compiler.access(self.path, self._ch_ids_exprs)
+        compiler.emit('%s%s = %s' % (parent, access,
+                                     compiler.value(self._value_expr)))
 
     # --- Private API ---------------------------------------------------------
 
@@ -210,6 +415,31 @@ class SetInstruction(BaseInstruction):
     #: Feature.
     _setter = Callable()
 
+    #: Compiled expression used to compute the value to set.
+    _value_expr = Typed(CompiledExpression)
+
+    #: Name of the set Feature used to look up the driver cache.
+    _feature_name = Str()
+
+    def _is_cached(self, parent, value):
+        """Check whether the driver cache already holds the value.
+
+        """
+        cache = getattr(parent, '_cache', None)
+        if not cache or self._feature_name not in cache:
+            return False
+
+        cached = cache[self._feature_name]
+        try:
+            if (isinstance(value, Real) and isinstance(cached, Real) and
+                    not isinstance(value, bool)):
+                return isclose(cached, value, rel_tol=self.rel_tol,
+                               abs_tol=self.abs_tol)
+            return bool(cached == value)
+        except Exception:
+            # Values which cannot be compared are considered different.
+            return False
+
 
 class CallInstruction(BaseInstruction):
     """Call an instrument action and store the result in the database.
@@ -227,32 +457,63 @@ class CallInstruction(BaseInstruction):
         """Build the callable accessing driver Feature.
 
         """
-        source = (
-            "def _call_(driver, kwargs, **ch_ids):"
-            "    return {path}(**kwargs)")
-        local = {}
-        exec(source.format(', '.join(self.ch_ids), self.path), local)
-        self._caller = local['_call_']
+        super(CallInstruction, self).prepare()
+        self._kwargs_exprs = tuple((k, compile_expression(v))
+                                   for k, v in self.action_kwargs.items())
+        self._caller = self._meta.accessor('call')
 
-    def execute(self, task, driver):
-        """Get the value of the Feature and store it in the database.
+    def evaluate(self, task):
+        """Evaluate the channel ids and the arguments of the Action.
+
+        """
+        return (self._eval_ch_ids(task),
+                {k: expr(task) for k, expr in self._kwargs_exprs})
+
+    def access(self, task, driver, evaluated):
+        """Call the Action.
+
+        """
+        ch_ids, action_kwargs = evaluated
+        parent = self._resolve_parent(driver, ch_ids)
+        return self._caller(parent, action_kwargs, **ch_ids)
+
+    def store(self, task, res):
+        """Store the result of the call in the database.
 
         """
-        ch_ids = {k: task.format_and_eval_string(v)
-                  for k, v in self.ch_ids.items()}
-        action_kwargs = {k: task.format_and_eval_string(v)
-                         for k, v in self.action_kwargs.items()}
-        res = self._caller(driver, action_kwargs, **ch_ids)
         if self.ret_names:
-            for i, name in enumerate(self.get_names):
-                task.write_in_database(name, res[i])
+            for i, name in enumerate(self.ret_names):
+                task.write_in_database(self.id + '_' + name, res[i])
         else:
             task.write_in_database(self.id, res)
 
+    def generate_source(self, compiler):
+        """Call the Action and write the result(s) in the database.
+
+        """
+        kwargs = ', '.join('%s=%s' % (k, compiler.value(expr))
+                           for k, expr in self._kwargs_exprs)
+        parent, access = compiler.access(self.path, self._ch_ids_exprs)
+        if self.ret_names:
+            res = compiler.new_name('_r')
+            compiler.emit('%s = %s%s(%s)' % (res, parent, access, kwargs))
+            for i, name in enumerate(self.ret_names):
+                compiler.emit('write(%r, %s[%d])' %
+                              (self.id + '_' + name, res, i))
+            compiler.written(self.id + '_' + n for n in self.ret_names)
+        else:
+            compiler.emit('write(%r, %s%s(%s))' %
+                          (self.id, parent, access, kwargs))
+            compiler.written((self.id,))
+
     # --- Private API ---------------------------------------------------------
 
     #: Caller function streamlining the process of calling a driver Action.
-    _setter = Callable()
+    _caller = Callable()
+
+    #: Pairs of keyword names and compiled expressions used to compute the
+    #: arguments of the Action at runtime.
+    _kwargs_exprs = Tuple()
 
     def _post_setattr_ret_names(self, old, new):
         if new:
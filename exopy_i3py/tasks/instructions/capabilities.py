@@ -0,0 +1,364 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by Exopy-I3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Index of the capabilities (features, actions, channels) of driver classes.
+
+The index of a driver class is a trie whose nodes match the attributes
+accessible from the driver. It is built the first time it is requested and
+cached for the lifetime of the class, so that checks, hinters and editors can
+query the structure of a driver without introspecting it again.
+
+I3py drivers are introspected using the __feats__, __actions__,
+__subsystems__ and __channels__ mappings of the classes and the abstract
+classes of I3py when available. Other classes are introspected using their
+public attributes.
+
+"""
+from inspect import getattr_static, isclass
+from weakref import WeakSet
+
+try:
+    from i3py.core.abstracts import (AbstractFeature, AbstractAction,
+                                     AbstractChannel)
+except ImportError:  # pragma: no cover
+    AbstractFeature = AbstractAction = AbstractChannel = None
+
+#: Kinds of the nodes of the index.
+KINDS = ('driver', 'feature', 'action', 'subsystem', 'channel', 'attribute')
+
+#: Value types of the standard I3py features, identified by class name.
+FEATURE_TYPES = {'Float': float, 'Int': int, 'Unicode': str, 'Str': str,
+                 'Bool': bool, 'Register': int}
+
+#: Maximal depth of the index (protects against cyclic structures).
+MAX_DEPTH = 10
+
+
+class CapabilityNode(object):
+    """Node of the capability index matching an attribute of the driver.
+
+    """
+    __slots__ = ('name', 'kind', 'obj', 'children', 'value_type', 'limits',
+                 'unit', 'values', 'available', 'path')
+
+    def __init__(self, name, kind, obj, path):
+        #: Name of the attribute.
+        self.name = name
+        #: Kind of attribute (see KINDS).
+        self.kind = kind
+        #: Object found on the class (Feature, Action, class, ...).
+        self.obj = obj
+        #: Nodes of the attributes of the object (subsystems, channels).
+        self.children = {}
+        #: Type of the value of a Feature (None if unknown).
+        self.value_type = None
+        #: Limits of a Feature, either a static value or the name of the
+        #: limits on the driver.
+        self.limits = None
+        #: Unit of a Feature.
+        self.unit = None
+        #: Allowed values for a Feature.
+        self.values = None
+        #: Statically known ids of a channel container.
+        self.available = None
+        #: Dotted path of the node starting with driver (channel access are
+        #: not included).
+        self.path = path
+
+    def __repr__(self):
+        return '<CapabilityNode %s (%s)>' % (self.path, self.kind)
+
+
+class DriverCapabilities(object):
+    """Index of the capabilities of a driver class.
+
+    Parameters
+    ----------
+    driver_cls : type
+        Driver class to index.
+
+    """
+    __slots__ = ('root', '__weakref__')
+
+    def __init__(self, driver_cls):
+        self.root = CapabilityNode('driver', 'driver', driver_cls, 'driver')
+        _index_class(self.root, driver_cls, (driver_cls,))
+
+    def lookup(self, path):
+        """Find the node matching a path.
+
+        Parameters
+        ----------
+        path : str
+            Dotted path starting with driver. Channel access (ex: ch[i]) are
+            ignored.
+
+        Returns
+        -------
+        node : CapabilityNode or None
+            Node matching the path or None if the path is not indexed.
+
+        """
+        node = self.root
+        for part in path.split('.')[1:]:
+            node = node.children.get(part.split('[', 1)[0])
+            if node is None:
+                return None
+        return node
+
+    def check(self, path, ch_ids):
+        """Check that a path is valid.
+
+        Parameters
+        ----------
+        path : str
+            Path to check, starting with driver.
+
+        ch_ids : iterable
+            Names of the channel ids which can appear in the path.
+
+        Returns
+        -------
+        test : bool
+            Whether or not the path is valid.
+
+        msg : str
+            Error message explaining why the path is invalid.
+
+        """
+        parts = path.split('.')
+        if parts[0] != 'driver':
+            return (False,
+                    'The path of the instruction should start by "driver"')
+
+        node = self.root
+        obj = None
+        valid_path = self.root.obj.__name__
+        for part in parts[1:]:
+            if '[' in part:
+                if ']' not in part:
+                    return False, 'Malformed channel access: %s' % part
+                ch_id = part.split('[')[1].split(']')[0]
+                if ch_id not in ch_ids:
+                    return (False,
+                            'Unknown channel id %s, know ids are %s' %
+                            (ch_id, list(ch_ids)))
+                part = part.split('[')[0]
+
+            child = node.children.get(part) if node is not None else None
+            if child is None:
+                # Past the indexed part of the driver (or for private
+                # attributes) use plain introspection.
+                if node is not None:
+                    obj = node.obj
+                if not hasattr(obj, part):
+                    return False, '%s has no attribute %s' % (valid_path,
+                                                              part)
+                obj = getattr(obj, part)
+            node = child
+            valid_path += '.' + part
+
+        return True, ''
+
+    def complete(self, path):
+        """List the possible completions of a partial path.
+
+        Parameters
+        ----------
+        path : str
+            Partial dotted path starting with driver, the last part being the
+            beginning of an attribute name.
+
+        Returns
+        -------
+        completions : list
+            Sorted full paths of the matching attributes (channel accesses
+            present in the partial path are preserved).
+
+        """
+        head, _, start = path.rpartition('.')
+        node = self.lookup(head) if head else None
+        if node is None:
+            return []
+        return sorted(head + '.' + name for name in node.children
+                      if name.startswith(start))
+
+    def iter_nodes(self, kind=None):
+        """Iterate over all the nodes of the index (depth first).
+
+        Parameters
+        ----------
+        kind : str, optional
+            Kind of the nodes to yield. If None all nodes are yielded.
+
+        """
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            if kind is None or node.kind == kind:
+                yield node
+            stack.extend(reversed(sorted(node.children.values(),
+                                         key=lambda n: n.name)))
+
+
+#: Name of the class attribute under which the index of a class is stored.
+INDEX_ATTR = '_exopy_i3py_capabilities_'
+
+#: Classes whose index is currently stored.
+_INDEXED = WeakSet()
+
+
+def get_capabilities(driver_cls):
+    """Get the capability index of a driver class.
+
+    The index is built on first access and cached as long as the class
+    exists.
+
+    """
+    # The index references the class (and its methods, which can reference
+    # the class in turn), so a WeakKeyDictionary would keep the class alive
+    # forever. Storing the index on the class creates a cycle which is
+    # collected along with the class.
+    try:
+        return vars(driver_cls)[INDEX_ATTR]
+    except KeyError:
+        index = DriverCapabilities(driver_cls)
+    except TypeError:
+        # Objects without a __dict__ are not cached.
+        return DriverCapabilities(driver_cls)
+
+    try:
+        setattr(driver_cls, INDEX_ATTR, index)
+        _INDEXED.add(driver_cls)
+    except (TypeError, AttributeError):
+        # Immutable classes, do not cache.
+        pass
+    return index
+
+
+def clear_capabilities(driver_cls=None):
+    """Discard the cached indexes.
+
+    Parameters
+    ----------
+    driver_cls : type, optional
+        Driver class whose index should be discarded. If None, all indexes
+        are discarded.
+
+    """
+    classes = list(_INDEXED) if driver_cls is None else [driver_cls]
+    for cls in classes:
+        _INDEXED.discard(cls)
+        if INDEX_ATTR in getattr(cls, '__dict__', {}):
+            delattr(cls, INDEX_ATTR)
+
+
+# --- Private API -------------------------------------------------------------
+
+def _index_class(node, cls, stack):
+    """Create the children of a node pointing to a class.
+
+    """
+    if len(stack) > MAX_DEPTH:
+        return
+
+    feats = getattr(cls, '__feats__', None) or {}
+    actions = getattr(cls, '__actions__', None) or {}
+    channels = getattr(cls, '__channels__', None) or {}
+    subsystems = getattr(cls, '__subsystems__', None) or {}
+
+    for name in dir(cls):
+        if name.startswith('_'):
+            continue
+        try:
+            raw = getattr_static(cls, name)
+            obj = getattr(cls, name)
+        except Exception:
+            continue
+
+        path = node.path + '.' + name
+        kind = _classify(name, raw, obj, feats, actions, channels, subsystems)
+        if kind == 'feature':
+            obj = feats.get(name, raw)
+        child = CapabilityNode(name, kind, obj, path)
+        node.children[name] = child
+
+        if kind == 'feature':
+            _describe_feature(child, obj)
+        elif kind in ('channel', 'subsystem'):
+            sub_cls = _subpart_class(channels.get(name) or
+                                     subsystems.get(name) or raw, obj)
+            if kind == 'channel':
+                child.available = _static_ids(raw)
+            if sub_cls is not None and sub_cls not in stack:
+                child.obj = sub_cls
+                _index_class(child, sub_cls, stack + (sub_cls,))
+
+
+def _classify(name, raw, obj, feats, actions, channels, subsystems):
+    """Determine the kind of an attribute.
+
+    """
+    if name in feats or (AbstractFeature is not None and
+                         isinstance(raw, AbstractFeature)):
+        return 'feature'
+    if name in actions or (AbstractAction is not None and
+                           isinstance(raw, AbstractAction)):
+        return 'action'
+    if name in channels or (isclass(obj) and AbstractChannel is not None and
+                            issubclass(obj, AbstractChannel)):
+        return 'channel'
+    if name in subsystems:
+        return 'subsystem'
+    if hasattr(raw, 'creation_kwargs') and hasattr(raw, '__set__'):
+        return 'feature'
+    if isclass(getattr(raw, 'cls', None)):
+        return 'channel'
+    if isclass(obj):
+        return 'subsystem'
+    if callable(obj):
+        return 'action'
+    return 'attribute'
+
+
+def _subpart_class(declaration, obj):
+    """Extract the class of a subsystem or channel.
+
+    """
+    for candidate in (declaration, obj, getattr(declaration, 'cls', None)):
+        if isclass(candidate):
+            return candidate
+    return None
+
+
+def _static_ids(declaration):
+    """Extract the statically known ids of a channel container.
+
+    """
+    available = getattr(declaration, 'available', None)
+    if isinstance(available, (list, tuple, range)):
+        return tuple(available)
+    return None
+
+
+def _describe_feature(node, feat):
+    """Extract type, limits, unit and values from a Feature.
+
+    """
+    for cls in type(feat).__mro__:
+        if cls.__name__ in FEATURE_TYPES:
+            node.value_type = FEATURE_TYPES[cls.__name__]
+            break
+
+    kwargs = getattr(feat, 'creation_kwargs', None) or {}
+    node.limits = kwargs.get('limits')
+    node.unit = kwargs.get('unit')
+    values = kwargs.get('values')
+    if values is None and kwargs.get('mapping'):
+        values = tuple(kwargs['mapping'])
+    node.values = tuple(values) if values is not None else None
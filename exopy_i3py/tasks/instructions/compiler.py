@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by Exopy-I3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Generation of a single function performing a whole list of instructions.
+
+Each instruction contributes some lines of source code to the function, the
+compiler taking care of hoisting the attribute chains and of evaluating only
+once the expressions depending on the database shared by several
+instructions.
+
+"""
+from atom.api import Atom, Value, List, Dict, Int
+
+#: Name of the parameters of the generated function.
+FUNCTION_PARAMETERS = ('task', 'driver')
+
+
+def parse_path(path):
+    """Split an instruction path into a list of access operations.
+
+    Parameters
+    ----------
+    path : str
+        Dot separated path starting with "driver" in which channels are
+        accessed using brackets, ex: driver.output[ch].voltage
+
+    Returns
+    -------
+    operations : list
+        List of tuple ('attr', name) or ('item', ch_id_name) describing how to
+        access the target starting from the driver.
+
+    """
+    operations = []
+    for part in path.split('.')[1:]:
+        if '[' in part:
+            name, ch = part.split('[', 1)
+            operations.append(('attr', name))
+            operations.append(('item', ch.rstrip(']')))
+        else:
+            operations.append(('attr', part))
+    return operations
+
+
+class PerformCompiler(Atom):
+    """Object collecting the source code of a fused perform function.
+
+    """
+    #: Task for which the function is generated.
+    task = Value()
+
+    #: Lines of the body of the function.
+    lines = List()
+
+    #: Namespace in which the function is created. Hold the constants and
+    #: compiled expressions.
+    namespace = Dict()
+
+    def value(self, expr):
+        """Get the name under which the value of an expression is available.
+
+        Expressions depending on database entries are evaluated only if no
+        valid evaluation already exists. The others (ex: random()) are
+        evaluated each time, as when executing the instructions in turn.
+
+        Parameters
+        ----------
+        expr : exopy_i3py.tasks.instructions.expressions.CompiledExpression
+            Expression whose value is needed.
+
+        """
+        if expr.is_constant:
+            return self.constant(expr.value)
+
+        if not expr.entries:
+            name = self.new_name('_v')
+            self.emit('%s = %s(task)' % (name, self.constant(expr)))
+            return name
+
+        if expr.source not in self._values:
+            expr_name = self.constant(expr)
+            name = self.new_name('_v')
+            self.emit('%s = %s(task)' % (name, expr_name))
+            self._values[expr.source] = (name, expr.entries)
+
+        return self._values[expr.source][0]
+
+    def access(self, path, ch_ids_exprs):
+        """Get the source code accessing the target of a path.
+
+        All intermediate objects are stored in local variables so that
+        instructions sharing a common prefix do not access it twice.
+
+        Parameters
+        ----------
+        path : str
+            Path of the instruction.
+
+        ch_ids_exprs : tuple
+            Pairs of channel id names and compiled expressions.
+
+        Returns
+        -------
+        parent : str
+            Name of the variable holding the object on which the last access
+            is performed.
+
+        last : str
+            Source code of the last access (ex: '.voltage' or '[_v0]').
+
+        """
+        exprs = dict(ch_ids_exprs)
+        parent = 'driver'
+        operations = parse_path(path)
+        for i, op in enumerate(operations):
+            if op[0] == 'attr':
+                access = '.' + op[1]
+            else:
+                access = '[%s]' % self.value(exprs[op[1]])
+
+            if i == len(operations) - 1:
+                return parent, access
+
+            source = parent + access
+            if source not in self._objects:
+                name = self.new_name('_o')
+                self.emit('%s = %s' % (name, source))
+                self._objects[source] = name
+            parent = self._objects[source]
+
+    def constant(self, obj):
+        """Store an object in the namespace of the function.
+
+        Returns
+        -------
+        name : str
+            Name under which the object is accessible.
+
+        """
+        name = self.new_name('_c')
+        self.namespace[name] = obj
+        return name
+
+    def emit(self, line):
+        """Add a line to the body of the function.
+
+        """
+        self.lines.append(line)
+
+    def written(self, entries):
+        """Signal that some database entries of the task were written.
+
+        Evaluations depending on them are discarded.
+
+        Parameters
+        ----------
+        entries : iterable
+            Names of the entries, without the task name prefix.
+
+        """
+        full_names = {self.task.name + '_' + e for e in entries}
+        for source, (_, deps) in list(self._values.items()):
+            if full_names.intersection(deps):
+                del self._values[source]
+
+    def fallback(self, instruction):
+        """Call the execute method of an instruction unable to generate code.
+
+        As nothing is known about what the instruction does, all evaluations
+        are discarded.
+
+        """
+        name = self.constant(instruction)
+        self.emit('%s.execute(task, driver)' % name)
+        self._values.clear()
+
+    def compile(self, instructions):
+        """Generate the function performing all the instructions.
+
+        The instructions are expected to be prepared. As when executing the
+        instructions in turn, the function returns before each instruction if
+        the root task was asked to stop.
+
+        Returns
+        -------
+        function : callable
+            Function taking the task and the driver as arguments.
+
+        """
+        self.emit('write = task.write_in_database')
+        self.emit('stop = task.root.should_stop')
+        for instr in instructions:
+            self.emit('if stop.is_set():')
+            self.emit('    return')
+            instr.generate_source(self)
+
+        source = 'def _perform_({}):\n    {}'.format(
+            ', '.join(FUNCTION_PARAMETERS), '\n    '.join(self.lines))
+        namespace = self.namespace.copy()
+        exec(compile(source, '<%s perform>' % self.task.name, 'exec'),
+             namespace)
+        return namespace['_perform_']
+
+    def new_name(self, prefix):
+        """Generate a new unique variable name.
+
+        """
+        self._counter += 1
+        return prefix + str(self._counter)
+
+    # --- Private API ---------------------------------------------------------
+
+    #: Counter used to generate unique variable names.
+    _counter = Int()
+
+    #: Mapping between expression sources and the name of the variable
+    #: holding their value and the entries they depend on.
+    _values = Dict()
+
+    #: Mapping between the access source code and the local variable holding
+    #: the object.
+    _objects = Dict()
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by Exopy-I3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Expressions compiled once at preparation time and evaluated at runtime.
+
+Instructions evaluate the same strings (channel ids, values, action
+arguments) at each execution. Rather than going through
+`format_and_eval_string` each time, the string is analysed once and turned
+into a callable object taking the task as single argument.
+
+"""
+import re
+from ast import literal_eval
+
+from exopy.tasks.tasks.string_evaluation import EVALUATER_TOOLS
+
+#: Regular expression matching a database entry reference.
+ENTRY_PATTERN = re.compile(r'\{([^{}]+)\}')
+
+#: Regular expression matching a string made of a single database reference.
+SINGLE_ENTRY_PATTERN = re.compile(r'^\s*\{([^{}]+)\}\s*$')
+
+
+class CompiledExpression(object):
+    """Base class for expressions compiled ahead of their evaluation.
+
+    Parameters
+    ----------
+    source : str
+        Original string from which the expression was built.
+
+    """
+    __slots__ = ('source', 'entries')
+
+    def __init__(self, source):
+        self.source = source
+        self.entries = ()
+
+    @property
+    def is_constant(self):
+        """Whether the expression always evaluates to the same value.
+
+        """
+        return False
+
+    def __call__(self, task):
+        """Evaluate the expression using the database of the task.
+
+        """
+        raise NotImplementedError
+
+    def __repr__(self):
+        return '%s(%r)' % (type(self).__name__, self.source)
+
+
+class ConstantExpression(CompiledExpression):
+    """Expression folded into a constant at compilation time.
+
+    """
+    __slots__ = ('value',)
+
+    def __init__(self, source, value):
+        super(ConstantExpression, self).__init__(source)
+        self.value = value
+
+    @property
+    def is_constant(self):
+        """A constant expression is by definition constant.
+
+        """
+        return True
+
+    def __call__(self, task):
+        """Simply return the folded value.
+
+        """
+        return self.value
+
+
+class EntryExpression(CompiledExpression):
+    """Expression consisting of a single database reference.
+
+    """
+    __slots__ = ('entry',)
+
+    def __init__(self, source, entry):
+        super(EntryExpression, self).__init__(source)
+        self.entry = entry
+        self.entries = (entry,)
+
+    def __call__(self, task):
+        """Retrieve the value from the database without any evaluation.
+
+        """
+        return task.get_from_database(self.entry)
+
+
+class EvalExpression(CompiledExpression):
+    """Generic expression evaluated from a pre-compiled code object.
+
+    """
+    __slots__ = ('code', 'namespace', 'locals_names')
+
+    def __init__(self, source, code, entries, locals_names):
+        super(EvalExpression, self).__init__(source)
+        self.code = code
+        self.entries = entries
+        self.locals_names = locals_names
+        self.namespace = EVALUATER_TOOLS.copy()
+
+    def __call__(self, task):
+        """Evaluate the code object using the current database values.
+
+        """
+        get = task.get_from_database
+        local = {n: get(e) for n, e in zip(self.locals_names, self.entries)}
+        return eval(self.code, self.namespace, local)
+
+
+def compile_expression(string):
+    """Analyse a string and build the fastest evaluator for it.
+
+    Parameters
+    ----------
+    string : str
+        String as accepted by `format_and_eval_string`, ie a Python expression
+        in which database entries are referenced by their name surrounded by
+        curly braces.
+
+    Returns
+    -------
+    expression : CompiledExpression
+        Callable taking the task as single argument and returning the value of
+        the expression.
+
+    Raises
+    ------
+    SyntaxError :
+        Raised if the string is not a valid Python expression once the
+        database references have been substituted.
+
+    """
+    match = SINGLE_ENTRY_PATTERN.match(string)
+    if match:
+        return EntryExpression(string, match.group(1).strip())
+
+    if '{' not in string:
+        try:
+            return ConstantExpression(string, literal_eval(string.strip()))
+        except (ValueError, SyntaxError, TypeError):
+            pass
+
+    entries = []
+    names = []
+
+    def replace(match):
+        entry = match.group(1).strip()
+        if entry not in entries:
+            entries.append(entry)
+            names.append('__entry_%d' % (len(entries) - 1))
+        return names[entries.index(entry)]
+
+    formatted = ENTRY_PATTERN.sub(replace, string).strip()
+    code = compile(formatted, '<%s>' % string, 'eval')
+    return EvalExpression(string, code, tuple(entries), tuple(names))
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by Exopy-I3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Instruction reading several Features of the same object at once.
+
+"""
+import logging
+
+from atom.api import List, Str, Bool
+
+from .base_instructions import BaseInstruction
+
+try:
+    from i3py.core.errors import I3pyFailedGet
+except ImportError:  # pragma: no cover
+    I3pyFailedGet = ValueError
+
+logger = logging.getLogger(__name__)
+
+#: Errors signaling that the coalesced answer could not be parsed.
+PARSE_ERRORS = (ValueError, TypeError, KeyError, I3pyFailedGet)
+
+
+class GetManyInstruction(BaseInstruction):
+    """Read several Features of an object and store them in the database.
+
+    The path of the instruction points to the object owning the Features
+    (driver, channel or subsystem). When possible, the queries of all the
+    Features are coalesced in a single message, otherwise the Features are
+    read one after the other.
+
+    Coalescing is possible when the object is message based (it has a query
+    method) and all the Features are plain i3py Features whose getter is a
+    static command. The answer is expected to contain the individual answers
+    separated by the same separator as the commands. Coalesced reads always
+    query the instrument, the cache of the driver being bypassed.
+
+    """
+    #: Names of the Features to read.
+    features = List(Str()).tag(pref=True)
+
+    #: Whether to try to coalesce the queries in a single message.
+    coalesce = Bool(True).tag(pref=True)
+
+    #: Separator used to join the commands and split the answer.
+    separator = Str(';').tag(pref=True)
+
+    def check(self, task, driver_cls):
+        """Check that all the Features exist and the hinter.
+
+        """
+        for f in self.features:
+            test, msg = self._check_path(self.path + '.' + f, driver_cls)
+            if not test:
+                return test, msg
+
+        return super(GetManyInstruction, self).check(task, driver_cls)
+
+    def prepare(self):
+        """Build the callable accessing the object owning the Features.
+
+        """
+        super(GetManyInstruction, self).prepare()
+        self._can_coalesce = self.coalesce
+
+    def access(self, task, driver, ch_ids):
+        """Read all the Features.
+
+        """
+        obj = self._resolve_parent(driver, ch_ids)
+        values = None
+        if self._can_coalesce:
+            values = self._read_coalesced(obj)
+        if values is None:
+            values = [getattr(obj, f) for f in self.features]
+        return values
+
+    def store(self, task, values):
+        """Write the values of all the Features in the database.
+
+        """
+        prefix = self.id + '_'
+        for f, value in zip(self.features, values):
+            task.write_in_database(prefix + f, value)
+
+    # --- Private API ---------------------------------------------------------
+
+    #: Whether coalescing should be attempted during this run. Set to False
+    #: the first time coalescing fails.
+    _can_coalesce = Bool()
+
+    def _resolve_parent(self, driver, ch_ids):
+        """The object pointed by the path is the one owning the Features.
+
+        """
+        meta = self._meta
+        return self._resolve(driver, ch_ids, meta.path,
+                             meta.object_resolver())
+
+    def _read_coalesced(self, obj):
+        """Read all the Features using a single query.
+
+        Returns
+        -------
+        values : list or None
+            Values of the features or None if coalescing is not possible or
+            the answer could not be parsed. In that case, coalescing is
+            disabled for the rest of the run. Communication errors are not
+            caught.
+
+        """
+        cls = type(obj)
+        feats = [getattr(cls, f, None) for f in self.features]
+        commands = [getattr(f, 'creation_kwargs', {}).get('getter')
+                    for f in feats]
+        if (not hasattr(obj, 'query') or
+                not all(isinstance(c, str) and '{' not in c
+                        for c in commands)):
+            self._can_coalesce = False
+            return None
+
+        with obj.lock:
+            for feat in feats:
+                feat.pre_get(obj)
+            answer = obj.query(self.separator.join(commands))
+
+        # The whole answer has been read at this point, so falling back to
+        # individual reads cannot pick up a stale answer.
+        raws = answer.split(self.separator)
+        try:
+            if len(raws) != len(feats):
+                raise ValueError('Got %d answers, expected %d' %
+                                 (len(raws), len(feats)))
+            return [feat.post_get(obj, raw.strip())
+                    for feat, raw in zip(feats, raws)]
+        except PARSE_ERRORS as e:
+            logger.warning('Failed to parse the coalesced answer of %s (%s), '
+                           'reading the features one by one.', self.path, e)
+            self._can_coalesce = False
+            return None
+
+    def _post_setattr_features(self, old, new):
+        """Update the database entries when the Features change.
+
+        """
+        self.database_entries = self._default_database_entries()
+
+    def _default_database_entries(self):
+        """Default database names used by the instruction.
+
+        """
+        return {self.id + '_' + f: 1.0 for f in self.features}
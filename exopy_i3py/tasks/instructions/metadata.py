@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by Exopy-I3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Metadata shared by all the instructions accessing the same path.
+
+The metadata only depend on the path and the names of the channel ids, so a
+single instance is shared (interned) between all the instructions using the
+same path. An instance is discarded once no instruction uses it anymore. The
+accessors are only built when first requested, so that attaching the metadata
+to an instruction is cheap. The metadata also remember the resolution cache
+of the last driver used, so that the instructions do not have to.
+
+The channel ids values (and their compiled expressions) and the hinter differ
+between the instructions using the same path and are hence not shared.
+
+"""
+from sys import intern
+from weakref import WeakValueDictionary, ref
+
+from .accessors import build_accessor, get_resolution_cache
+
+
+class InstructionMetadata(object):
+    """Static description of the target of an instruction.
+
+    Parameters
+    ----------
+    path : str
+        Path of the instruction, starting with driver.
+
+    ch_names : tuple
+        Sorted names of the channel ids appearing in the path.
+
+    """
+    __slots__ = ('path', 'ch_names', 'parent_path', 'target_path',
+                 '_accessors', '_resolution', '__weakref__')
+
+    def __init__(self, path, ch_names):
+        #: Interned path of the instruction.
+        self.path = intern(path)
+        #: Sorted names of the channel ids.
+        self.ch_names = ch_names
+        parent_path, _, target = path.rpartition('.')
+        #: Path of the object owning the target of the instruction.
+        self.parent_path = intern(parent_path)
+        #: Path of the target relative to its parent (starting with driver).
+        #: The accessors operate on the resolved parent which is passed in
+        #: place of the driver.
+        self.target_path = intern('driver.' + target)
+        self._accessors = {}
+        # Weak reference to the last driver used and its resolution cache.
+        # Both are stored in a single tuple so that instructions executed in
+        # parallel always see a consistent pair.
+        self._resolution = None
+
+    def accessor(self, kind):
+        """Get the function accessing the target from its parent.
+
+        Parameters
+        ----------
+        kind : {'get', 'set', 'call'}
+            Kind of access to perform.
+
+        """
+        try:
+            return self._accessors[kind]
+        except KeyError:
+            acc = build_accessor(kind, self.target_path, self.ch_names)
+            return self._accessors.setdefault(kind, acc)
+
+    def parent_resolver(self):
+        """Get the function resolving the parent of the target from the
+        driver.
+
+        """
+        try:
+            return self._accessors['parent']
+        except KeyError:
+            acc = build_accessor('get', self.parent_path, self.ch_names)
+            return self._accessors.setdefault('parent', acc)
+
+    def object_resolver(self):
+        """Get the function resolving the object pointed by the path.
+
+        """
+        try:
+            return self._accessors['object']
+        except KeyError:
+            acc = build_accessor('get', self.path, self.ch_names)
+            return self._accessors.setdefault('object', acc)
+
+    def resolution_cache(self, driver):
+        """Get the cache of the objects resolved from a driver.
+
+        Returns
+        -------
+        cache : dict or None
+            Resolution cache of the driver (see
+            exopy_i3py.tasks.instructions.accessors.get_resolution_cache) or
+            None if the driver cannot be weakly referenced.
+
+        """
+        resolution = self._resolution
+        if resolution is not None and resolution[0]() is driver:
+            return resolution[1]
+        try:
+            cache = get_resolution_cache(driver)
+        except TypeError:
+            self._resolution = None
+            return None
+        self._resolution = (ref(driver), cache)
+        return cache
+
+
+#: Interned metadata.
+_METADATA = WeakValueDictionary()
+
+
+def get_metadata(path, ch_ids):
+    """Get the metadata shared by the instructions using a path.
+
+    Parameters
+    ----------
+    path : str
+        Path of the instruction, starting with driver.
+
+    ch_ids : iterable
+        Names of the channel ids appearing in the path.
+
+    """
+    key = (path, tuple(sorted(ch_ids)))
+    meta = _METADATA.get(key)
+    if meta is None:
+        meta = _METADATA.setdefault(key, InstructionMetadata(*key))
+    return meta
+
+
+def metadata_count():
+    """Number of metadata instances currently shared.
+
+    """
+    return len(_METADATA)
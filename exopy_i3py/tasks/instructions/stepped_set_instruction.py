@@ -1,2 +1,185 @@
 # -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by Exopy-I3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Instruction setting a Feature by going through intermediate values.
 
+"""
+from time import monotonic
+from traceback import format_exc
+
+import numpy as np
+from atom.api import Str, Bool, Callable, Typed
+
+from .base_instructions import SetInstruction
+from .capabilities import get_capabilities
+from .expressions import CompiledExpression, compile_expression
+
+
+class SteppedSetInstruction(SetInstruction):
+    """Ramp the value of a Feature from its current value to the target one.
+
+    The sequence of values is computed once at the beginning of the execution
+    and the writes are paced against a monotonic clock so that the requested
+    rate is respected without accumulating delays. Only Features holding
+    floating point values can be ramped.
+
+    When skip_unchanged is set, the ramp is skipped if the driver cache
+    indicates that the target value (within abs_tol and rel_tol) is already
+    set.
+
+    """
+    #: Largest difference allowed between two consecutive values.
+    step = Str().tag(pref=True)
+
+    #: Maximal rate at which the value can be changed (in unit of the feature
+    #: per second). If empty the steps are performed as fast as possible.
+    rate = Str().tag(pref=True)
+
+    #: Whether to read the value after each step and store it in the database.
+    #: If False the database is left untouched.
+    read_back = Bool().tag(pref=True)
+
+    def check(self, task, driver_cls):
+        """Check the path, the Feature type and that the step and rate are
+        valid expressions.
+
+        """
+        test, res = super(SteppedSetInstruction, self).check(task, driver_cls)
+        if not test:
+            return test, res
+
+        # Features whose type is unknown (not declared through I3py) are
+        # assumed to hold floats.
+        node = get_capabilities(driver_cls).lookup(self.path)
+        if (node is not None and node.kind == 'feature' and
+                node.value_type not in (None, float)):
+            return (False,
+                    'Only Features holding floats can be ramped, %s holds %s '
+                    'values.' % (self.path, node.value_type.__name__))
+
+        if not self.step.strip():
+            return False, 'No step was specified.'
+
+        for name in ('step', 'rate'):
+            source = getattr(self, name)
+            if not source:
+                continue
+            try:
+                compile_expression(source)
+            except SyntaxError:
+                return (False,
+                        'Invalid %s expression:\n%s' % (name, format_exc()))
+
+        return True, res
+
+    def prepare(self):
+        """Build the callables accessing the driver Feature.
+
+        """
+        super(SteppedSetInstruction, self).prepare()
+        self._step_expr = compile_expression(self.step)
+        self._rate_expr = (compile_expression(self.rate) if self.rate else
+                           None)
+        self._getter = self._meta.accessor('get')
+
+    def evaluate(self, task):
+        """Evaluate the channel ids, target value, step and rate.
+
+        """
+        return (self._eval_ch_ids(task), self._value_expr(task),
+                abs(self._step_expr(task)),
+                abs(self._rate_expr(task)) if self._rate_expr else 0)
+
+    def access(self, task, driver, evaluated):
+        """Go through all the steps leading to the target value.
+
+        The ramp is interrupted if the measurement is stopped. The read backs
+        are written in the database as they are performed.
+
+        """
+        ch_ids, target, step, rate = evaluated
+        parent = self._resolve_parent(driver, ch_ids)
+        if self.skip_unchanged and self._is_cached(parent, target):
+            self.skipped_writes += 1
+            return
+        current = self._getter(parent, **ch_ids)
+        values = self.compute_ramp(current, target, step)
+        # All steps have the same amplitude so that a single delay paces the
+        # whole ramp (including ramps made of a single step).
+        delay = abs(values[0] - current) / rate if rate else 0
+
+        # Each write is scheduled relatively to the start of the ramp, a full
+        # delay elapsing before the first one so that the rate holds from the
+        # current value. Waiting on the stop event allows to interrupt the
+        # ramp promptly.
+        should_stop = task.root.should_stop
+        start = monotonic()
+        for i, value in enumerate(values):
+            remaining = start + (i + 1)*delay - monotonic()
+            if ((remaining > 0 and should_stop.wait(remaining)) or
+                    should_stop.is_set()):
+                break
+            self._setter(parent, value, **ch_ids)
+            if self.read_back:
+                task.write_in_database(self.id,
+                                       self._getter(parent, **ch_ids))
+
+    def generate_source(self, compiler):
+        """Stepping cannot be inlined, so rely on execute.
+
+        """
+        compiler.fallback(self)
+
+    @staticmethod
+    def compute_ramp(start, stop, step):
+        """Compute the values to go through to reach stop from start.
+
+        Parameters
+        ----------
+        start : float
+            Current value of the Feature (not included in the ramp).
+
+        stop : float
+            Target value (always the last value of the ramp).
+
+        step : float
+            Largest difference allowed between two consecutive values.
+
+        Returns
+        -------
+        values : list
+            Values to set in order.
+
+        """
+        if not step:
+            return [stop]
+        n_steps = max(int(np.ceil(abs(stop - start) / step)), 1)
+        return np.linspace(start, stop, n_steps + 1)[1:].tolist()
+
+    # --- Private API ---------------------------------------------------------
+
+    #: Getter function used to read the starting value and the read backs.
+    _getter = Callable()
+
+    #: Compiled expression used to compute the maximal step.
+    _step_expr = Typed(CompiledExpression)
+
+    #: Compiled expression used to compute the maximal rate.
+    _rate_expr = Typed(CompiledExpression)
+
+    def _post_setattr_read_back(self, old, new):
+        """Update the database entries when the read back is (de)activated.
+
+        """
+        self.database_entries = {self.id: 1.0} if new else {}
+
+    def _default_database_entries(self):
+        """Default database names used by the instruction.
+
+        """
+        return {self.id: 1.0} if self.read_back else {}
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by Exopy-I3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Validation of the paths of the instructions against driver classes.
+
+The paths are validated using the capability index of the driver class. The
+result of the validation only depends on the driver class, the path and
+the names of the channel ids, so it is cached per driver class. The cache
+being keyed by weak references, the results are discarded when a driver class
+is garbage collected (for example when the drivers are reloaded). The cache
+can also be cleared explicitly if a driver class is modified in place.
+
+"""
+from weakref import WeakKeyDictionary
+
+from .capabilities import get_capabilities, clear_capabilities
+
+#: Results of the paths validation for each driver class.
+_PATH_CACHES = WeakKeyDictionary()
+
+#: Number of validations served from the cache and performed.
+_STATS = {'hits': 0, 'misses': 0}
+
+
+def check_path(path, driver_cls, ch_ids):
+    """Check that a path can be accessed on a driver class.
+
+    Parameters
+    ----------
+    path : str
+        Path to check, starting with driver.
+
+    driver_cls : type
+        Driver class on which the path should be accessible.
+
+    ch_ids : iterable
+        Names of the channel ids which can appear in the path.
+
+    Returns
+    -------
+    test : bool
+        Whether or not the path is valid.
+
+    msg : str
+        Error message explaining why the path is invalid.
+
+    """
+    try:
+        cache = _PATH_CACHES[driver_cls]
+    except KeyError:
+        cache = _PATH_CACHES.setdefault(driver_cls, {})
+    except TypeError:
+        # Not weak referenceable, do not cache.
+        return get_capabilities(driver_cls).check(path, ch_ids)
+
+    key = (path, frozenset(ch_ids))
+    try:
+        result = cache[key]
+        _STATS['hits'] += 1
+    except KeyError:
+        result = cache[key] = get_capabilities(driver_cls).check(path, ch_ids)
+        _STATS['misses'] += 1
+    return result
+
+
+def path_cache_info():
+    """Get statistics about the validation cache.
+
+    """
+    return {'hits': _STATS['hits'], 'misses': _STATS['misses'],
+            'size': sum(len(c) for c in _PATH_CACHES.values())}
+
+
+def clear_path_cache(driver_cls=None):
+    """Discard the cached validation results and capability indexes.
+
+    Parameters
+    ----------
+    driver_cls : type, optional
+        Driver class whose results should be discarded. If None, the results
+        of all classes are discarded.
+
+    """
+    if driver_cls is None:
+        _PATH_CACHES.clear()
+    else:
+        _PATH_CACHES.pop(driver_cls, None)
+    clear_capabilities(driver_cls)
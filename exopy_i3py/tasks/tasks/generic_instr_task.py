@@ -9,13 +9,24 @@
 """Task allowing to access any driver Feature/Action of an I3py driver.
 
 """
-from atom.api import List, Signal
+import ast
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait
+from threading import Event
+from time import perf_counter
+
+from atom.api import (List, Signal, Enum, Callable, Bool, Typed, Int, Dict,
+                      Value)
 
 from exopy.tasks.api import InstrumentTask, DRIVER_DEPENDENCY_ID
 from exopy.utils.container_change import ContainerChange
 from exopy.utils.atom_util import update_members_from_preferences
 
+from ..hinters.base_hinters import DEP_TYPE as HINTER_DEP_TYPE
 from ..instructions.base_instructions import DEP_TYPE
+from ..instructions.compiler import PerformCompiler
+from .instrumentation import TimingRecorder
 
 
 class GenericI3pyTask(InstrumentTask):
@@ -30,9 +41,55 @@ class GenericI3pyTask(InstrumentTask):
     #: modified.
     instruction_changed = Signal()
 
+    #: How the instructions should be executed:
+    #: - sequential: each instruction is executed in turn
+    #: - compiled: a single function performing all the instructions is
+    #:   generated when preparing the task, avoiding the cost of dispatching
+    #:   to each instruction and sharing the common driver accesses.
+    #: - parallel: consecutive instructions tagged with different parallel
+    #:   groups (see BaseInstruction.parallel_group) are executed concurrently
+    #:   on a thread pool, the instructions of a group being executed in
+    #:   order. Untagged instructions are executed in the order of the list.
+    execution_mode = Enum('sequential', 'compiled', 'parallel').tag(pref=True)
+
+    #: Maximal number of threads used to execute instructions in parallel.
+    max_workers = Int(4).tag(pref=True)
+
+    #: Whether to record the time spent in each phase of the execution of the
+    #: instructions (evaluation, driver access, database storage). Per
+    #: instruction timings are only available in the sequential and parallel
+    #: modes, in the other modes only the total duration is recorded.
+    #: Instructions which cannot be split in phases are timed as a whole.
+    record_timings = Bool().tag(pref=True)
+
+    #: Whether to write the summary of the timings in the database (under
+    #: the 'timings' entry) once the measurement is over. Only used if
+    #: record_timings is True.
+    timings_in_database = Bool().tag(pref=True)
+
+    #: Timings recorded during the last run if record_timings is True.
+    timings = Typed(TimingRecorder)
+
+    #: How the instructions are stored in the preferences:
+    #: - sections: one section per instruction (instruction_0, ...)
+    #: - table: a single section whose entries are the columns of a table
+    #:   having one row per instruction, which is more compact and faster to
+    #:   load for large numbers of instructions.
+    #: Both formats are read whatever the value. The table is generated when
+    #: the preferences are updated before being saved.
+    serialization_format = Enum('sections', 'table').tag(pref=True)
+
     def check(self, *args, **kwargs):
         """Check that all instructions are properly configured.
 
+        Only the instructions modified since the last check (or whose hint
+        depends on the database) are checked again, the hints of the others
+        being reused. Modifications are detected by comparing the preferences
+        of the instructions (including their hinter) to the ones they had
+        when last checked, so that in place edits (of the channel ids for
+        example) are detected. All instructions are checked when the driver
+        changes.
+
         """
         test, traceback = super().check(*args, **kwargs)
         if not test:
@@ -45,20 +102,108 @@ class GenericI3pyTask(InstrumentTask):
         # This is safe since the InstrumentTask checks passed
         d_cls, _ = run_time[DRIVER_DEPENDENCY_ID][d_id]
 
+        if d_cls is not self._checked_driver:
+            self.clear_check_cache()
+            self._checked_driver = d_cls
+
+        valid = True
+        checked = self._checked_hints
         for instr in self.instructions:
-            test, value_or_error = instr.check(self, d_cls)
-            if test:
-                for entry_id, value in value_or_error.items():
-                    self.write_in_database(entry_id, value)
+            prefs = instr.preferences_from_members()
+            cached = checked.get(instr)
+            if cached is not None and cached[0] == prefs:
+                hints = cached[1]
             else:
-                traceback[err_path + '-' + instr.id] = value_or_error
+                checked.pop(instr, None)
+                test, hints = instr.check(self, d_cls)
+                if not test:
+                    traceback[err_path + '-' + instr.id] = hints
+                    valid = False
+                    continue
+                hinter = instr.hinter
+                if hinter is None or '{' not in hinter.user_value:
+                    checked[instr] = (prefs, hints)
+
+            for entry_id, value in hints.items():
+                self.write_in_database(entry_id, value)
+
+        return valid, traceback
+
+    def clear_check_cache(self):
+        """Discard the results of the previous checks.
+
+        All instructions will be checked during the next check.
+
+        """
+        self._checked_hints.clear()
+
+    def prepare(self):
+        """Prepare the instructions for execution.
+
+        This is where the instructions compile the expressions they will have
+        to evaluate at each execution.
+
+        """
+        super().prepare()
+        for i in self.instructions:
+            i.prepare()
+
+        self.timings = TimingRecorder() if self.record_timings else None
+        if self.timings and self.execution_mode in ('sequential', 'parallel'):
+            for i in self.instructions:
+                self.timings.register(i)
+
+        if self.execution_mode == 'compiled':
+            compiler = PerformCompiler(task=self)
+            self._compiled_perform = compiler.compile(self.instructions)
+
+        elif self.execution_mode == 'parallel':
+            self._parallel_steps = _split_in_steps(self.instructions)
+            if self._pool is not None:
+                self._pool.shutdown(wait=True)
+                self._pool = None
+            # The pool is registered in the root resources so that its
+            # threads are joined when the resources are released. Without
+            # concurrent groups, the instructions are simply executed in turn.
+            width = max((len(step) for step in self._parallel_steps),
+                        default=0)
+            if width > 1:
+                self._pool = ThreadPoolExecutor(min(width, self.max_workers))
+                threads = self.root.resources['threads']
+                with threads.safe_access(self.path + '/' + self.name) as t:
+                    t.append(_ExecutorDispatcher(self._pool))
+
+        # Summarizing the timings is too costly to be done after each
+        # perform, so the summary is written when the resources of the root
+        # are released (ie once the execution is over).
+        if self.timings is not None and self.timings_in_database:
+            threads = self.root.resources['threads']
+            with threads.safe_access(self.path + '/' + self.name) as t:
+                t.append(_PostRunHook(self.write_timings))
 
     def perform(self):
         """Call all instructions in order.
 
         """
-        for i in self.instructions:
-            i.execute(self, self.driver)
+        timings = self.timings
+        if timings is not None:
+            start = perf_counter()
+
+        self._perform()
+
+        if timings is not None:
+            timings.perform.record(perf_counter() - start)
+
+    def write_timings(self):
+        """Write the summary of the recorded timings in the database.
+
+        This is done automatically at the end of the measurement if
+        timings_in_database is True but can also be called at any time to get
+        intermediate results.
+
+        """
+        if self.timings is not None and 'timings' in self.database_entries:
+            self.write_in_database('timings', self.timings.summary())
 
     def add_instruction(self, instruction, index):
         """Add an instruction at the given index.
@@ -72,25 +217,50 @@ class GenericI3pyTask(InstrumentTask):
             Instruction to insert in the list of instructions.
 
         """
-        self.instructions.insert(index, instruction)
+        self.add_instructions(index, [instruction])
+
+    def add_instructions(self, index, instructions):
+        """Add several instructions starting at the given index.
+
+        A single change is emitted for all the added instructions.
+
+        Parameters
+        ----------
+        index : int
+            Index at which to insert the first instruction.
+
+        instructions : list
+            Instructions to insert in the list of instructions.
+
+        """
+        old_count = len(self.instructions)
+        if index < 0:
+            index = max(old_count + index, 0)
+        index = min(index, old_count)
+        self.instructions[index:index] = instructions
 
         # In the absence of a root task do nothing else than inserting the
-        # child.
+        # children.
         if self.has_root:
 
             # Register the new entries in the database
-            db_entries = self.database_entries.copy()
-            db_entries.update(instruction.database_entries)
-            self.database_entries = db_entries
-            instruction.observe('database_entries',
-                                self._react_to_instr_database_entries_change)
-
-            # Register anew preferences to keep the right ordering for the
+            with self.coalesce_database_entries():
+                for instruction in instructions:
+                    self._update_database_entries(
+                        instruction, added=instruction.database_entries)
+                    instruction.observe(
+                        'database_entries',
+                        self._react_to_instr_database_entries_change)
+
+            # Update the preferences to keep the right ordering for the
             # instructions
-            self.register_preferences()
+            sources = list(range(old_count))
+            sources[index:index] = instructions
+            self._update_instruction_preferences(sources, old_count)
 
             change = ContainerChange(obj=self, name='instructions',
-                                     added=[(index, instruction)])
+                                     added=[(index + i, instr) for i, instr
+                                            in enumerate(instructions)])
             self.instruction_changed(change)
 
     def remove_instruction(self, index):
@@ -102,22 +272,42 @@ class GenericI3pyTask(InstrumentTask):
             Index at which the instruction to remove is located.
 
         """
-        instruction = self.instructions.pop(index)
+        self.remove_instructions([index])
+
+    def remove_instructions(self, indexes):
+        """Remove several instructions from the instructions list.
+
+        A single change is emitted for all the removed instructions.
+
+        Parameters
+        ----------
+        indexes : iterable
+            Indexes at which the instructions to remove are located.
+
+        """
+        old_count = len(self.instructions)
+        indexes = sorted({i + old_count if i < 0 else i for i in indexes},
+                         reverse=True)
+        removed = [(i, self.instructions.pop(i)) for i in indexes]
 
         # Cleanup database
-        db_entries = self.database_entries.copy()
-        for k in db_entries:
-            if k in instruction.database_entries:
-                del db_entries[k]
-        self.database_entries = db_entries
-        instruction.unobserve('database_entries',
-                              self._react_to_instr_database_entries_change)
+        with self.coalesce_database_entries():
+            for _, instruction in removed:
+                self._update_database_entries(
+                    instruction, removed=instruction.database_entries)
+                instruction.unobserve(
+                    'database_entries',
+                    self._react_to_instr_database_entries_change)
+                self._checked_hints.pop(instruction, None)
 
         # Update preferences
-        self.register_preferences()
+        removed_indexes = set(indexes)
+        self._update_instruction_preferences(
+            [i for i in range(old_count) if i not in removed_indexes],
+            old_count)
 
         change = ContainerChange(obj=self, name='instructions',
-                                 removed=[(index, instruction)])
+                                 removed=removed)
         self.instruction_changed(change)
 
     def move_instruction(self, old, new):
@@ -138,24 +328,61 @@ class GenericI3pyTask(InstrumentTask):
         # In the absence of a root task do nothing else than moving the
         # child.
         if self.has_root:
-            # Register anew preferences to keep the right ordering for the
+            # Renumber the preferences to keep the right ordering for the
             # children
-            self.register_preferences()
+            count = len(self.instructions)
+            sources = list(range(count))
+            sources.insert(new, sources.pop(old))
+            self._update_instruction_preferences(sources, count)
 
             change = ContainerChange(obj=self, name='instructions',
                                      moved=[(old, new, instruction)])
             self.instruction_changed(change)
 
+    @contextmanager
+    def coalesce_database_entries(self):
+        """Context manager coalescing the modifications of the database
+        entries made by the instructions into a single assignment.
+
+        """
+        if self._working_entries is not None:
+            yield
+            return
+
+        self._working_entries = self.database_entries.copy()
+        self._working_entries_modified = False
+        try:
+            yield
+        finally:
+            entries, self._working_entries = self._working_entries, None
+            if self._working_entries_modified:
+                self.database_entries = entries
+
     def register_preferences(self):
         """Create the task entries in the preferences object.
 
         """
         super(GenericI3pyTask, self).register_preferences()
+        prefs = self.preferences
+
+        # Register the instructions (the preferences were cleared by the
+        # parent class, so no section of the other format remains).
+        rows = [instr.preferences_from_members()
+                for instr in self.instructions]
+        if self.serialization_format == 'table':
+            prefs[TABLE_SECTION] = _rows_to_table(rows)
+        else:
+            for i, row in enumerate(rows):
+                prefs['instruction_{}'.format(i)] = row
+
+    def update_preferences_from_members(self):
+        """Update the entries in the preferences object.
+
+        The instructions are registered anew, which is when the table of the
+        instructions is generated if this format is used.
 
-        # Register the instructions
-        for i, instr in enumerate(self.instructions):
-            child_id = 'instruction_{}'.format(i)
-            self.preferences[child_id] = instr.preferences_from_members()
+        """
+        self.register_preferences()
 
     @classmethod
     def build_from_config(cls, config, dependencies):
@@ -174,21 +401,33 @@ class GenericI3pyTask(InstrumentTask):
         task = cls()
         update_members_from_preferences(task, config)
 
-        # Collect and build the instructions
-        i = 0
-        pref = 'instruction_{}'
+        # Collect the instructions configs
+        if TABLE_SECTION in config:
+            configs = _table_to_rows(config[TABLE_SECTION])
+        else:
+            i = 0
+            pref = 'instruction_{}'
+            configs = []
+            while True:
+                instr_name = pref.format(i)
+                if instr_name not in config:
+                    break
+                configs.append(config[instr_name])
+                i += 1
+
+        # Build the instructions, looking up each class only once.
+        classes = {}
+        instr_classes = dependencies[DEP_TYPE]
         instructions = []
-        while True:
-            instr_name = pref.format(i)
-            if instr_name not in config:
-                break
-            instr_config = config[instr_name]
+        for instr_config in configs:
             instr_class_name = instr_config.pop('instruction_id')
-            instr_cls = dependencies[DEP_TYPE][instr_class_name]
-            instr = instr_cls.build_from_config(instr_config,
-                                                dependencies)
-            instructions.append(instr)
-            i += 1
+            try:
+                instr_cls = classes[instr_class_name]
+            except KeyError:
+                instr_cls = classes[instr_class_name] =\
+                    instr_classes[instr_class_name]
+            instructions.append(instr_cls.build_from_config(instr_config,
+                                                            dependencies))
 
         task.instructions = instructions
 
@@ -215,15 +454,364 @@ class GenericI3pyTask(InstrumentTask):
     # --- Private API ---------------------------------------------------------
     # =========================================================================
 
+    #: Function performing all instructions generated in compiled mode.
+    _compiled_perform = Callable()
+
+    #: Steps executed in turn in parallel mode, each step being a list of
+    #: groups of instructions executed concurrently.
+    _parallel_steps = List()
+
+    #: Thread pool used to execute the instructions in parallel.
+    _pool = Typed(ThreadPoolExecutor)
+
+    #: Preferences and hints of the instructions at their last successful
+    #: check.
+    _checked_hints = Dict()
+
+    #: Driver class used during the last check.
+    _checked_driver = Value()
+
+    #: Instruction owning each of the database entries of the instructions.
+    _entry_owners = Dict()
+
+    #: Working copy of the database entries while modifications are being
+    #: coalesced.
+    _working_entries = Typed(dict)
+
+    #: Whether the working copy of the database entries was modified.
+    _working_entries_modified = Bool()
+
+    def _post_setattr_serialization_format(self, old, new):
+        """Store the instructions using the new format.
+
+        """
+        if old != new and self.preferences is not None:
+            self.register_preferences()
+
+    def _update_instruction_preferences(self, sources, old_count):
+        """Update the preferences of the instructions after an edition.
+
+        In table format nothing is done. Otherwise, only the sections of the
+        added instructions are created. As ConfigObj appends new sections, the
+        sections starting from the first modified index are removed and added
+        back in order, which keeps them sorted in the saved files. If the
+        preferences were not in sync with the instructions before the edition,
+        they are registered anew.
+
+        Parameters
+        ----------
+        sources : list
+            For each index in the new list of instructions, the previous
+            index of the instruction or the instruction itself if it was
+            added.
+
+        old_count : int
+            Number of instructions before the edition.
+
+        """
+        prefs = self.preferences
+        if prefs is None:
+            return
+
+        # The table is only generated when updating the preferences before
+        # saving them, as any edition requires to generate it again.
+        if self.serialization_format == 'table':
+            return
+
+        name = 'instruction_{}'.format
+        if ((old_count and name(old_count - 1) not in prefs) or
+                name(old_count) in prefs):
+            self.register_preferences()
+            return
+
+        first = next((i for i, src in enumerate(sources)
+                      if not isinstance(src, int) or src != i), len(sources))
+        tail = {}
+        for i in range(first, old_count):
+            tail[i] = prefs[name(i)]
+            del prefs[name(i)]
+
+        for new in range(first, len(sources)):
+            src = sources[new]
+            prefs[name(new)] = (tail[src] if isinstance(src, int) else
+                                src.preferences_from_members())
+
+    def _perform(self):
+        """Execute the instructions in a blocking fashion.
+
+        """
+        if self.execution_mode == 'compiled':
+            self._compiled_perform(self, self.driver)
+        elif self.execution_mode == 'parallel' and self._pool:
+            self._perform_in_parallel()
+        else:
+            self._execute_group(self.instructions)
+
+    def _execute_group(self, instructions):
+        """Execute in order a group of instructions.
+
+        The execution is interrupted as soon as the root task is asked to
+        stop.
+
+        """
+        driver = self.driver
+        timings = self.timings
+        stop = self.root.should_stop
+        if timings is None:
+            for i in instructions:
+                if stop.is_set():
+                    return
+                i.execute(self, driver)
+        else:
+            for i in instructions:
+                if stop.is_set():
+                    return
+                timings.execute(i, self, driver)
+
+    def _perform_in_parallel(self):
+        """Execute the steps in turn, the groups of a step concurrently.
+
+        The driver is not locked here, i3py Features and Actions acquiring the
+        driver lock themselves when communicating.
+
+        """
+        stop = self.root.should_stop
+        for groups in self._parallel_steps:
+            if stop.is_set():
+                return
+            if len(groups) == 1:
+                self._execute_group(groups[0])
+                continue
+            futures = [self._pool.submit(self._execute_group, group)
+                       for group in groups]
+            wait(futures)
+            for f in futures:
+                f.result()
+
+    def _post_setattr_instructions(self, old, new):
+        """Track the database entries of instructions assigned at once.
+
+        This happens in particular when rebuilding the task from a config, the
+        entries of the old instructions being removed and the ones of the new
+        instructions registered.
+
+        """
+        callback = self._react_to_instr_database_entries_change
+        with self.coalesce_database_entries():
+            for instruction in old or ():
+                self._update_database_entries(
+                    instruction, removed=instruction.database_entries)
+                instruction.unobserve('database_entries', callback)
+                self._checked_hints.pop(instruction, None)
+            for instruction in new:
+                self._update_database_entries(
+                    instruction, added=instruction.database_entries)
+                instruction.observe('database_entries', callback)
+
+    def _post_setattr_record_timings(self, old, new):
+        """Add or remove the database entry used to store the timings.
+
+        """
+        self._update_timings_entry()
+
+    def _post_setattr_timings_in_database(self, old, new):
+        """Add or remove the database entry used to store the timings.
+
+        """
+        self._update_timings_entry()
+
+    def _update_timings_entry(self):
+        """Declare the timings entry only if the timings are both recorded
+        and written in the database.
+
+        """
+        if self.record_timings and self.timings_in_database:
+            self._update_database_entries(None, added={'timings': {}})
+        else:
+            self._update_database_entries(None, removed=('timings',))
+
     def _react_to_instr_database_entries_change(self, change):
         """Update the database entries whenever an instruction modify its used
         names.
 
         """
-        db_entries = self.database_entries.copy()
-        if 'old_value' in change:
-            for k in db_entries:
-                if k in change['object'].database_entries:
-                    del db_entries[k]
-        db_entries.update(change['value'])
-        self.database_entries = db_entries
+        if change['type'] == 'create':
+            return
+        self._update_database_entries(change['object'],
+                                      removed=change.get('oldvalue') or (),
+                                      added=change['value'])
+
+    def _update_database_entries(self, owner, removed=(), added=None):
+        """Remove and add entries owned by an instruction (or the task).
+
+        Only the affected keys are touched. An entry is removed only if it
+        is owned by the instruction, so that an instruction cannot remove an
+        entry registered by another one.
+
+        Parameters
+        ----------
+        owner : BaseInstruction or None
+            Instruction owning the entries or None for the entries of the
+            task itself.
+
+        removed : iterable, optional
+            Names of the entries to remove.
+
+        added : dict, optional
+            Entries to add.
+
+        """
+        with self.coalesce_database_entries():
+            entries = self._working_entries
+            owners = self._entry_owners
+            for k in removed:
+                if owners.get(k) is owner and k in entries:
+                    owners.pop(k, None)
+                    del entries[k]
+                    self._working_entries_modified = True
+            if added:
+                entries.update(added)
+                owners.update(dict.fromkeys(added, owner))
+                self._working_entries_modified = True
+
+
+class _ExecutorDispatcher(object):
+    """Wrapper allowing to store a thread pool in the threads resource.
+
+    The resource expects the objects it stores to expose an inactive Event
+    and a stop method (see exopy ThreadDispatcher).
+
+    """
+    def __init__(self, executor):
+        self.executor = executor
+        self.inactive = Event()
+
+    def stop(self):
+        """Wait for the pending jobs and join the worker threads.
+
+        """
+        self.executor.shutdown(wait=True)
+        self.inactive.set()
+
+
+class _PostRunHook(object):
+    """Wrapper allowing to run a callback when the threads resource is
+    released, that is once the execution of the measurement is over.
+
+    """
+    def __init__(self, callback):
+        self.callback = callback
+        self.inactive = Event()
+
+    def stop(self):
+        """Run the callback once.
+
+        """
+        if not self.inactive.is_set():
+            try:
+                self.callback()
+            finally:
+                self.inactive.set()
+
+
+def _split_in_steps(instructions):
+    """Split the instructions in steps to execute in turn in parallel mode.
+
+    Each step is a list of groups of instructions which can be executed
+    concurrently. A run of consecutive tagged instructions forms a single
+    step in which the instructions are grouped by tag, while a run of
+    untagged instructions forms a step made of a single group.
+
+    """
+    steps = []
+    for instr in instructions:
+        tag = instr.parallel_group or None
+        if not steps or (tag is None) != (None in steps[-1]):
+            steps.append(OrderedDict())
+        steps[-1].setdefault(tag, []).append(instr)
+    return [list(groups.values()) for groups in steps]
+
+
+#: Name of the section holding the table of instructions.
+TABLE_SECTION = 'instructions_table'
+
+#: Preferences stored in dedicated columns of the table, the others being
+#: stored in the 'extra' column.
+TABLE_COLUMNS = ('instruction_id', 'id', 'path', 'ch_ids', 'value',
+                 'action_kwargs')
+
+#: Columns of the table holding the preferences of the hinters as
+#: (column, preference) pairs. The other preferences of the hinters are
+#: stored in the 'extra' column under the 'hinter' key.
+HINTER_COLUMNS = (('hinter_id', 'hinter_id'), ('hinter_value', 'user_value'))
+
+
+def _rows_to_table(rows):
+    """Convert the preferences of the instructions to a table.
+
+    Each column is stored as the representation of the list of its values.
+    The dependency types and ids of the instructions and hinters are stored
+    once per class in dependency_N sub-sections so that they can be collected
+    from the configuration.
+
+    """
+    table = {'count': str(len(rows))}
+    for col in TABLE_COLUMNS:
+        table[col] = repr([r.get(col) for r in rows])
+
+    hinters = [r.get('hinter') for r in rows]
+    for col, pref in HINTER_COLUMNS:
+        table[col] = repr([h.get(pref) if h is not None else None
+                           for h in hinters])
+
+    excluded = TABLE_COLUMNS + ('dep_type', 'hinter')
+    hinter_excluded = ('dep_type',) + tuple(p for _, p in HINTER_COLUMNS)
+    extras = []
+    for r, h in zip(rows, hinters):
+        extra = {k: v for k, v in r.items() if k not in excluded}
+        if h is not None:
+            h_extra = {k: v for k, v in h.items() if k not in hinter_excluded}
+            if h_extra:
+                extra['hinter'] = h_extra
+        extras.append(extra)
+    table['extra'] = repr(extras)
+
+    deps = OrderedDict()
+    for r in rows:
+        deps[(r.get('dep_type', DEP_TYPE), 'instruction_id',
+              r.get('instruction_id'))] = None
+    for h in hinters:
+        if h is not None:
+            deps[(h.get('dep_type', HINTER_DEP_TYPE), 'hinter_id',
+                  h.get('hinter_id'))] = None
+    for i, (dep_type, key, value) in enumerate(deps):
+        table['dependency_{}'.format(i)] = {'dep_type': dep_type, key: value}
+
+    return table
+
+
+def _table_to_rows(table):
+    """Convert a table to the preferences of the instructions.
+
+    """
+    count = int(table['count'])
+    hinter_columns = tuple(c for c, _ in HINTER_COLUMNS)
+    columns = {c: ast.literal_eval(table[c])
+               for c in TABLE_COLUMNS + hinter_columns + ('extra',)}
+    rows = []
+    for i in range(count):
+        row = dict(columns['extra'][i])
+        hinter = row.pop('hinter', {})
+        for col in TABLE_COLUMNS:
+            value = columns[col][i]
+            if value is not None:
+                row[col] = value
+        if columns['hinter_id'][i] is not None:
+            hinter = dict(hinter, dep_type=HINTER_DEP_TYPE)
+            for col, pref in HINTER_COLUMNS:
+                value = columns[col][i]
+                if value is not None:
+                    hinter[pref] = value
+            row['hinter'] = hinter
+        rows.append(row)
+    return rows
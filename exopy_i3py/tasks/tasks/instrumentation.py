@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Tools used to measure the time spent executing the instructions.
+
+"""
+from math import log10
+from time import perf_counter
+
+from ..instructions.base_instructions import BaseInstruction
+
+#: Phases of the execution of an instruction.
+PHASES = ('evaluate', 'access', 'store')
+
+#: Phase used for the instructions which cannot be split in phases.
+WHOLE = ('execute',)
+
+#: Percentiles reported in the summaries.
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyHistogram(object):
+    """Histogram of durations using logarithmically spaced bins.
+
+    Recording a duration is a constant time operation and the memory usage
+    does not depend on the number of recorded values. The percentiles are
+    estimated from the bins, the relative error being bounded by the width of
+    a bin.
+
+    Parameters
+    ----------
+    min_value : float, optional
+        Lower bound in seconds of the first bin. Smaller durations are
+        counted in the first bin.
+
+    decades : int, optional
+        Number of decades covered by the histogram. Larger durations are
+        counted in the last bin.
+
+    bins_per_decade : int, optional
+        Number of bins used for each decade.
+
+    """
+    __slots__ = ('counts', 'count', 'total', 'min', 'max', 'min_value',
+                 'bins_per_decade', '_offset')
+
+    def __init__(self, min_value=1e-7, decades=9, bins_per_decade=20):
+        self.counts = [0]*(decades*bins_per_decade)
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self.min_value = min_value
+        self.bins_per_decade = bins_per_decade
+        self._offset = log10(min_value)
+
+    def record(self, value):
+        """Record a duration (in seconds).
+
+        """
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= self.min_value:
+            index = 0
+        else:
+            index = min(int((log10(value) - self._offset) *
+                            self.bins_per_decade),
+                        len(self.counts) - 1)
+        self.counts[index] += 1
+
+    def percentile(self, percent):
+        """Estimate a percentile of the recorded durations.
+
+        Returns the upper edge of the bin containing the percentile, clipped
+        to the extrema of the recorded values.
+
+        """
+        if not self.count:
+            return float('nan')
+        threshold = self.count*percent/100
+        cumulated = 0
+        for i, c in enumerate(self.counts):
+            cumulated += c
+            if cumulated >= threshold:
+                edge = 10**(self._offset + (i + 1)/self.bins_per_decade)
+                return max(min(edge, self.max), self.min)
+        return self.max
+
+    def summary(self):
+        """Summarize the histogram in a dictionary.
+
+        """
+        summary = {'count': self.count,
+                   'mean': (self.total/self.count if self.count else
+                            float('nan')),
+                   'min': self.min if self.count else float('nan'),
+                   'max': self.max}
+        for p in PERCENTILES:
+            summary['p%d' % p] = self.percentile(p)
+        return summary
+
+
+class TimingRecorder(object):
+    """Record the time spent in each phase of the execution of instructions.
+
+    """
+    __slots__ = ('histograms', 'perform')
+
+    def __init__(self):
+        self.histograms = {}
+        self.perform = LatencyHistogram()
+
+    def register(self, instruction):
+        """Create the histograms of an instruction.
+
+        Instructions overriding execute or not implementing access cannot be
+        split in phases and their execution is timed as a whole.
+
+        """
+        phases = PHASES if _has_phases(instruction) else WHOLE
+        self.histograms[instruction] = tuple(LatencyHistogram()
+                                             for _ in phases)
+
+    def execute(self, instruction, task, driver):
+        """Execute an instruction and record the duration of each phase.
+
+        The instruction must have been registered.
+
+        """
+        hists = self.histograms[instruction]
+        if len(hists) == 1:
+            t0 = perf_counter()
+            instruction.execute(task, driver)
+            hists[0].record(perf_counter() - t0)
+            return
+
+        t0 = perf_counter()
+        evaluated = instruction.evaluate(task)
+        t1 = perf_counter()
+        result = instruction.access(task, driver, evaluated)
+        t2 = perf_counter()
+        instruction.store(task, result)
+        t3 = perf_counter()
+        hists[0].record(t1 - t0)
+        hists[1].record(t2 - t1)
+        hists[2].record(t3 - t2)
+
+    def summary(self):
+        """Summarize the recorded durations.
+
+        Returns
+        -------
+        summary : dict
+            Dictionary whose keys are the instructions ids (or path if the id
+            is empty) and values are dictionaries of the summaries of each
+            phase (or of the whole execution under 'execute'). Keys shared by
+            several instructions are suffixed by _1, _2, ... The 'perform' key
+            holds the summary of the whole perform.
+
+        """
+        summary = {'perform': self.perform.summary()}
+        for instr, hists in self.histograms.items():
+            name = key = instr.id or instr.path
+            i = 0
+            while key in summary:
+                i += 1
+                key = '%s_%d' % (name, i)
+            phases = PHASES if len(hists) > 1 else WHOLE
+            summary[key] = {p: h.summary() for p, h in zip(phases, hists)}
+        return summary
+
+
+def _has_phases(instruction):
+    """Whether the execution of an instruction goes through its phases.
+
+    """
+    cls = type(instruction)
+    return (cls.execute is BaseInstruction.execute and
+            cls.access is not BaseInstruction.access)
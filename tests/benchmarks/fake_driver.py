@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""In-memory driver mimicking the structure of an I3py driver.
+
+The driver exposes Features (cached or not), Actions and channels and can
+simulate the latency of the communication with the instrument.
+
+"""
+from threading import RLock
+from time import perf_counter, sleep
+
+
+class FakeFeature(object):
+    """Feature storing its value in the state of its owner.
+
+    Parameters
+    ----------
+    default :
+        Value returned before any set.
+
+    cached : bool, optional
+        Whether the value read from the instrument is cached.
+
+    getter : str, optional
+        Command used to retrieve the value (used only for introspection).
+
+    """
+    def __init__(self, default=0.0, cached=False, getter=None):
+        self.default = default
+        self.cached = cached
+        self.name = ''
+        self.creation_kwargs = {'getter': getter}
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        with obj.lock:
+            cache = obj._cache
+            if self.name in cache:
+                return cache[self.name]
+            obj.communicate()
+            value = obj._state.get(self.name, self.default)
+            if self.cached:
+                cache[self.name] = value
+            return value
+
+    def __set__(self, obj, value):
+        with obj.lock:
+            obj.communicate()
+            obj._state[self.name] = value
+            if self.cached:
+                obj._cache[self.name] = value
+
+    def pre_get(self, obj):
+        pass
+
+    def post_get(self, obj, value):
+        return float(value)
+
+
+class FakeChannelContainer(object):
+    """Container creating channels on demand.
+
+    """
+    def __init__(self, parent, cls, ids):
+        self._parent = parent
+        self._cls = cls
+        self.available = list(ids)
+        self._channels = {}
+
+    def __getitem__(self, ch_id):
+        if ch_id not in self.available:
+            raise KeyError('No channel %s' % ch_id)
+        if ch_id not in self._channels:
+            self._channels[ch_id] = self._cls(self._parent, ch_id)
+        return self._channels[ch_id]
+
+
+class FakeChannels(object):
+    """Descriptor giving access to the channels of a driver.
+
+    As for I3py drivers, the channel class is accessible on the driver class.
+
+    """
+    def __init__(self, cls):
+        self.cls = cls
+        self.name = ''
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self.cls
+        if self.name not in obj.__dict__:
+            obj.__dict__[self.name] = FakeChannelContainer(obj, self.cls,
+                                                           range(obj.n_ch))
+        return obj.__dict__[self.name]
+
+
+class FakeHasFeatures(object):
+    """Base class for the driver and its channels.
+
+    """
+    def __init__(self):
+        self._cache = {}
+        self._state = {}
+
+    def clear_cache(self):
+        self._cache.clear()
+
+
+class FakeChannel(FakeHasFeatures):
+    """Channel of the fake driver.
+
+    """
+    voltage = FakeFeature(0.0)
+
+    current = FakeFeature(0.0, getter='CURR?')
+
+    enabled = FakeFeature(False, cached=True)
+
+    def __init__(self, parent, ch_id):
+        super(FakeChannel, self).__init__()
+        self.parent = parent
+        self.id = ch_id
+        # A channel behind its own sub-connection does not share the lock of
+        # the driver.
+        self._lock = RLock() if parent.sub_connections else None
+
+    @property
+    def lock(self):
+        return self._lock or self.parent.lock
+
+    def communicate(self):
+        self.parent.communicate()
+
+    def measure(self, points=1):
+        """Action returning the channel voltage and current.
+
+        """
+        with self.lock:
+            self.communicate()
+            return self.voltage, self.current
+
+
+class FakeDriver(FakeHasFeatures):
+    """Driver with a configurable communication latency.
+
+    Parameters
+    ----------
+    latency : float, optional
+        Time in seconds spent in each communication with the instrument.
+
+    channels : int, optional
+        Number of output channels.
+
+    sub_connections : bool, optional
+        Whether each channel communicates through its own connection (as in
+        a multi-slot mainframe), in which case the channels do not share the
+        lock of the driver.
+
+    """
+    idn = FakeFeature('Fake instrument', cached=True)
+
+    frequency = FakeFeature(1.0)
+
+    output = FakeChannels(FakeChannel)
+
+    def __init__(self, latency=0.0, channels=16, sub_connections=False,
+                 **kwargs):
+        super(FakeDriver, self).__init__()
+        self.lock = RLock()
+        self.latency = latency
+        self.communications = 0
+        self.n_ch = channels
+        self.sub_connections = sub_connections
+
+    def initialize(self):
+        pass
+
+    def finalize(self):
+        pass
+
+    def communicate(self):
+        """Simulate a communication with the instrument.
+
+        Short latencies are simulated by busy waiting since sleep has a
+        coarse resolution.
+
+        """
+        self.communications += 1
+        if not self.latency:
+            return
+        if self.latency > 1e-3:
+            sleep(self.latency)
+        else:
+            end = perf_counter() + self.latency
+            while perf_counter() < end:
+                pass
+
+    def query(self, msg):
+        with self.lock:
+            self.communicate()
+            return ';'.join('1.0' for _ in msg.split(';'))
+
+    def fire(self, value=0):
+        """Action without channel access.
+
+        """
+        with self.lock:
+            self.communicate()
+            return value
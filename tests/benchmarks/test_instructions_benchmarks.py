@@ -0,0 +1,241 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Benchmarks of the execution, check and rebuilding of instructions.
+
+The benchmarks are only run when passing the --benchmarks option to pytest.
+The time per call is reported in the test properties (visible in the junit
+xml report). The overhead introduced by the instructions on top of the raw
+driver access is compared to a budget (in seconds per instruction) which can
+be adjusted using the EXOPY_I3PY_BENCH_BUDGET environment variable.
+
+"""
+import os
+from collections import OrderedDict
+from threading import Event
+from timeit import repeat
+
+import pytest
+from configobj import ConfigObj
+from exopy.tasks.api import RootTask
+
+from exopy_i3py.tasks.tasks.generic_instr_task import GenericI3pyTask
+from exopy_i3py.tasks.instructions.base_instructions import (
+    DEP_TYPE, GetInstruction, SetInstruction, CallInstruction)
+from exopy_i3py.tasks.hinters.base_hinters import (
+    BaseInstructionReturnHinter, DEP_TYPE as HINTER_DEP_TYPE)
+
+from .fake_driver import FakeDriver
+
+pytestmark = pytest.mark.benchmark
+
+#: Maximal overhead per instruction in seconds.
+BUDGET = float(os.environ.get('EXOPY_I3PY_BENCH_BUDGET', 5e-5))
+
+#: Number of instructions in the benchmarked tasks.
+SIZES = (1, 10, 100)
+
+
+def best_time(func, number):
+    """Best time per call out of several repetitions.
+
+    """
+    return min(repeat(func, number=number, repeat=5))/number
+
+
+def make_instruction(i):
+    """Create the i-th instruction of a benchmark task.
+
+    Get, Set and Call instructions alternate and address different channels.
+
+    """
+    ch_ids = OrderedDict(ch=str(i % 16))
+    kind = i % 3
+    if kind == 0:
+        instr = GetInstruction(id='v%d' % i, path='driver.output[ch].voltage',
+                               ch_ids=ch_ids)
+    elif kind == 1:
+        instr = SetInstruction(id='s%d' % i, path='driver.output[ch].voltage',
+                               ch_ids=ch_ids, value='{Test_v%d} + 1' % (i-1))
+    else:
+        instr = CallInstruction(id='c%d' % i, path='driver.output[ch].measure',
+                                ch_ids=ch_ids,
+                                action_kwargs=OrderedDict(points='10'),
+                                ret_names=['v', 'i'])
+    instr.hinter = BaseInstructionReturnHinter()
+    return instr
+
+
+def raw_access(driver, n):
+    """Perform on the driver the same operations as the benchmark task.
+
+    """
+    def perform():
+        last = 0.0
+        for i in range(n):
+            ch = driver.output[i % 16]
+            kind = i % 3
+            if kind == 0:
+                last = ch.voltage
+            elif kind == 1:
+                ch.voltage = last + 1
+            else:
+                ch.measure(points=10)
+    return perform
+
+
+@pytest.fixture
+def root():
+    """Root task to which the benchmarked task is attached.
+
+    """
+    return RootTask(should_stop=Event(), should_pause=Event())
+
+
+def build_task(root, size, extra=(), driver=None, **kwargs):
+    """Build a prepared task with the given number of instructions.
+
+    """
+    task = GenericI3pyTask(name='Test', **kwargs)
+    root.add_child_task(0, task)
+    instructions = [make_instruction(i) for i in range(size)] + list(extra)
+    for i, instr in enumerate(instructions):
+        task.add_instruction(instr, i)
+    # The driver is retrieved from the resources of the root when preparing
+    # the task, as if it had already been started.
+    root.resources['instrs'][task.selected_instrument] = (driver or
+                                                          FakeDriver(), None)
+    task.prepare()
+    root.database.prepare_to_run()
+    return task
+
+
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('mode', ['sequential', 'compiled'])
+def test_perform_overhead(root, record_property, size, mode):
+    """Measure the overhead of perform compared to raw driver accesses.
+
+    """
+    task = build_task(root, size, execution_mode=mode)
+    number = max(1000 // size, 10)
+    raw = best_time(raw_access(task.driver, size), number)
+    perform = best_time(task.perform, number)
+    overhead = (perform - raw)/size
+
+    record_property('perform_time', perform)
+    record_property('throughput', 1/perform)
+    record_property('overhead_per_instruction', overhead)
+    assert overhead < BUDGET
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_parallel_speedup(root, record_property, size):
+    """Check that parallel execution overlaps the communications of channels.
+
+    The channels of an I3py driver share the lock of the driver, so the
+    communications can only overlap when the channels use separate
+    connections. Each channel is read and then set, the instructions
+    addressing a channel being tagged with the same group.
+
+    """
+    instructions = []
+    for i in range(size):
+        ch = (i // 2) % 16
+        ch_ids = OrderedDict(ch=str(ch))
+        if i % 2:
+            instr = SetInstruction(id='s%d' % i, ch_ids=ch_ids,
+                                   path='driver.output[ch].voltage',
+                                   value='{Test_v%d} + 1' % (i - 1))
+        else:
+            instr = GetInstruction(id='v%d' % i, ch_ids=ch_ids,
+                                   path='driver.output[ch].voltage')
+        instr.parallel_group = 'ch%d' % ch
+        instructions.append(instr)
+    driver = FakeDriver(latency=2e-3, sub_connections=True)
+    task = build_task(root, 0, extra=instructions, driver=driver,
+                      execution_mode='parallel', max_workers=16)
+
+    driver.communications = 0
+    task.perform()
+    sequential = driver.communications*driver.latency
+
+    perform = best_time(task.perform, 3)
+    record_property('perform_time', perform)
+    if size > 1:
+        assert perform < 0.8*sequential
+
+
+@pytest.mark.parametrize('cls, kwargs',
+                         [(GetInstruction, {'path': 'driver.frequency'}),
+                          (SetInstruction, {'path': 'driver.frequency',
+                                            'value': '1.0'}),
+                          (CallInstruction, {'path': 'driver.fire',
+                                             'action_kwargs':
+                                                 OrderedDict(value='2')})])
+def test_execute_overhead(root, record_property, cls, kwargs):
+    """Measure the time needed to execute a single instruction.
+
+    """
+    instr = cls(id='b', **kwargs)
+    task = build_task(root, 0, extra=[instr])
+    driver = task.driver
+    execute = best_time(lambda: instr.execute(task, driver), 1000)
+    record_property('execute_time', execute)
+    assert execute < BUDGET
+
+
+@pytest.mark.parametrize('size', SIZES)
+def test_check_time(root, record_property, size):
+    """Measure the time needed to check the instructions of a task.
+
+    """
+    task = build_task(root, size)
+
+    def check():
+        for instr in task.instructions:
+            test, msg = instr.check(task, FakeDriver)
+            assert test, msg
+
+    check_time = best_time(check, 10)/size
+    record_property('check_time', check_time)
+    assert check_time < BUDGET*10
+
+
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('fmt', ['sections', 'table'])
+def test_build_from_config_time(root, record_property, size, fmt):
+    """Measure the time needed to rebuild a task from its preferences.
+
+    """
+    task = build_task(root, size, serialization_format=fmt)
+    task.preferences = ConfigObj()
+    task.register_preferences()
+    config = task.preferences.dict()
+    dependencies = {DEP_TYPE: {cls.__module__.split('.', 1)[0] + '.' +
+                               cls.__name__: cls
+                               for cls in (GetInstruction, SetInstruction,
+                                           CallInstruction)},
+                    HINTER_DEP_TYPE: {'exopy_i3py.BaseInstructionReturnHinter':
+                                      BaseInstructionReturnHinter}}
+
+    def build():
+        rebuilt = GenericI3pyTask.build_from_config(_copy(config),
+                                                    dependencies)
+        assert len(rebuilt.instructions) == size
+
+    build_time = best_time(build, 3)/size
+    record_property('build_time', build_time)
+    assert build_time < BUDGET*10
+
+
+def _copy(config):
+    """Copy a nested dict (build_from_config consumes some keys).
+
+    """
+    return {k: _copy(v) if isinstance(v, dict) else v
+            for k, v in config.items()}
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Pytest configuration.
+
+Tests marked as benchmark compare timings to budgets and depend on the load of
+the machine, they are hence only run when the --benchmarks option is passed.
+
+"""
+import pytest
+
+
+def pytest_addoption(parser):
+    """Add the option enabling the benchmarks.
+
+    """
+    parser.addoption('--benchmarks', action='store_true', default=False,
+                     help='Run the benchmarks.')
+
+
+def pytest_configure(config):
+    """Register the benchmark marker.
+
+    """
+    config.addinivalue_line('markers',
+                            'benchmark: timing test run only with '
+                            '--benchmarks')
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip the benchmarks unless they were requested.
+
+    """
+    if config.getoption('--benchmarks'):
+        return
+
+    skip = pytest.mark.skip(reason='Benchmarks run only with --benchmarks')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
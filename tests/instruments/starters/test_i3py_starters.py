@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Test the starters of I3py drivers.
+
+"""
+from exopy_i3py.instruments.starters.i3py_starters import I3pyStarter
+from exopy_i3py.instruments.starters.pool import shutdown_pools
+
+
+class Driver(object):
+    """Driver recording its initialization arguments.
+
+    """
+    def __init__(self, parameters, **kwargs):
+        self.parameters = parameters
+        self.kwargs = kwargs
+        self.finalized = False
+
+    def initialize(self):
+        pass
+
+    def finalize(self):
+        self.finalized = True
+
+    def clear_cache(self):
+        pass
+
+
+#: Connection as stored in an instrument profile.
+CONNECTION = {'id': 'TCPIP', 'address': '192.168.0.1'}
+
+
+def profile_settings(pooled):
+    """Settings as stored in an instrument profile (values are strings).
+
+    """
+    return {'id': 'exopy_i3py.i3py_settings', 'user_id': 'default',
+            'pooled': str(pooled), 'timeout': '10'}
+
+
+def test_start_with_profile_dicts():
+    """The plain dictionaries of the profiles are accepted and not altered.
+
+    """
+    settings = profile_settings(False)
+    driver = I3pyStarter().start(Driver, CONNECTION, settings)
+    assert driver.kwargs == CONNECTION
+    assert driver.parameters == {'timeout': '10'}
+    assert settings == profile_settings(False)
+
+
+def test_pooled_from_profile_dicts():
+    """The pooled setting is read from the dictionary of the profile.
+
+    """
+    starter = I3pyStarter()
+    pooled = starter.start(Driver, CONNECTION, profile_settings(True))
+    starter.stop(pooled)
+    assert not pooled.finalized
+    assert starter.start(Driver, CONNECTION, profile_settings(True)) is pooled
+
+    transient = starter.start(Driver, CONNECTION, profile_settings(False))
+    starter.stop(transient)
+    assert transient.finalized
+
+
+def test_check_infos_with_profile_dicts():
+    """Checking the infos of a pooled driver keeps it alive for the next
+    start.
+
+    """
+    starter = I3pyStarter()
+    assert starter.check_infos(Driver, CONNECTION, profile_settings(True))
+    assert starter.pool.idle_count() == 1
+
+
+def test_shutdown_pools():
+    """Shutting down the pools finalizes the idle drivers.
+
+    """
+    starter = I3pyStarter()
+    driver = starter.start(Driver, CONNECTION, profile_settings(True))
+    starter.stop(driver)
+    shutdown_pools()
+    assert driver.finalized
+    assert starter.pool.idle_count() == 0
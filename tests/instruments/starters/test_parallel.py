@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Test the concurrent execution of the start-up of instruments.
+
+"""
+from threading import Event, Lock, current_thread
+from time import sleep
+
+from exopy_i3py.instruments.starters.parallel import run_concurrently
+
+
+def test_no_jobs():
+    """Running no job returns empty results.
+
+    """
+    assert run_concurrently(lambda: None, {}) == ({}, {})
+
+
+def test_results_and_errors():
+    """Results and errors are reported per job.
+
+    """
+    def func(value):
+        if value < 0:
+            raise ValueError('Negative value')
+        return 2*value
+
+    results, errors = run_concurrently(func, {'a': (1,), 'b': (-1,),
+                                              'c': (3,)})
+    assert results == {'a': 2, 'c': 6}
+    assert list(errors) == ['b']
+    assert 'Negative value' in errors['b']
+
+
+def test_max_workers():
+    """No more than max_workers jobs run at the same time.
+
+    """
+    lock = Lock()
+    running = [0]
+    peak = [0]
+
+    def func(i):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        sleep(0.01)
+        with lock:
+            running[0] -= 1
+        return i
+
+    results, errors = run_concurrently(func, {i: (i,) for i in range(6)},
+                                       max_workers=2)
+    assert results == {i: i for i in range(6)}
+    assert not errors
+    assert peak[0] <= 2
+
+
+def test_timeout():
+    """Jobs exceeding the timeout are reported and their late result is
+    handed to on_late.
+
+    """
+    release = Event()
+    late = []
+    done = Event()
+
+    def func(block):
+        if block:
+            release.wait(10)
+        return block
+
+    def on_late(result):
+        late.append(result)
+        done.set()
+
+    results, errors = run_concurrently(func, {'fast': (False,),
+                                              'slow': (True,)},
+                                       timeout=0.05, on_late=on_late)
+    assert results == {'fast': False}
+    assert 'Timed out' in errors['slow']
+
+    release.set()
+    assert done.wait(10)
+    assert late == [True]
+
+
+def test_timeout_counted_from_start():
+    """Jobs waiting for a worker are not timed out.
+
+    """
+    def func(i):
+        sleep(0.05)
+        return i
+
+    results, errors = run_concurrently(func, {i: (i,) for i in range(4)},
+                                       max_workers=1, timeout=0.15)
+    assert results == {i: i for i in range(4)}
+    assert not errors
+
+
+def test_hung_job_does_not_block():
+    """A hung job runs on a daemon thread and does not starve the others.
+
+    """
+    release = Event()
+    daemons = []
+
+    def func(hang):
+        daemons.append(current_thread().daemon)
+        if hang:
+            release.wait()
+        return hang
+
+    try:
+        results, errors = run_concurrently(func, {'a': (True,),
+                                                  'b': (False,)},
+                                           max_workers=1, timeout=0.1)
+    finally:
+        release.set()
+    assert results == {'b': False}
+    assert list(errors) == ['a']
+    assert all(daemons)
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Test the pool keeping drivers alive between measurements.
+
+"""
+from time import sleep
+
+import pytest
+
+from exopy_i3py.instruments.starters import pool as pool_module
+from exopy_i3py.instruments.starters.pool import (DriverPool, make_pool_key,
+                                                  default_health_check)
+
+
+class Driver(object):
+    """Driver recording whether it was finalized.
+
+    """
+    def __init__(self, connected=True):
+        self.connected = connected
+        self.finalized = False
+
+    def finalize(self):
+        self.finalized = True
+
+
+@pytest.fixture
+def pool():
+    """Pool whose drivers never expire during a test.
+
+    """
+    return DriverPool(idle_timeout=60)
+
+
+def test_make_pool_key():
+    """Keys do not depend on the order of the arguments and support
+    unhashable values.
+
+    """
+    assert (make_pool_key(Driver, {'a': 1, 'b': 2}, {}) ==
+            make_pool_key(Driver, {'b': 2, 'a': 1}, {}))
+    assert (make_pool_key(Driver, {'a': [1]}, {}) ==
+            make_pool_key(Driver, {'a': [1]}, {}))
+    assert (make_pool_key(Driver, {'a': 1}, {}) !=
+            make_pool_key(Driver, {'a': 2}, {}))
+
+
+def test_acquire_released_driver(pool):
+    """A released driver is handed back for the same key only.
+
+    """
+    driver = Driver()
+    assert pool.acquire('a') is None
+    pool.register('a', driver)
+    assert pool.release(driver)
+    assert pool.idle_count() == 1
+    assert pool.acquire('b') is None
+    assert pool.acquire('a') is driver
+    assert pool.idle_count() == 0
+    assert not driver.finalized
+
+
+def test_release_unknown_driver(pool):
+    """Drivers not registered in the pool are left to the caller.
+
+    """
+    assert not pool.release(Driver())
+    assert pool.idle_count() == 0
+
+
+def test_acquire_unhealthy_driver(pool):
+    """Unhealthy drivers are finalized instead of being handed back.
+
+    """
+    driver = Driver()
+    pool.register('a', driver)
+    pool.release(driver)
+    driver.connected = False
+    assert pool.acquire('a') is None
+    assert driver.finalized
+
+
+def test_purge(pool, monkeypatch):
+    """Drivers idle for longer than the timeout are finalized.
+
+    """
+    driver = Driver()
+    pool.register('a', driver)
+    pool.release(driver)
+    pool.purge()
+    assert not driver.finalized
+
+    now = pool_module.monotonic()
+    monkeypatch.setattr(pool_module, 'monotonic', lambda: now + 120)
+    pool.purge()
+    assert driver.finalized
+    assert pool.idle_count() == 0
+
+
+def test_purge_all_drivers(pool):
+    """All idle drivers can be finalized at once.
+
+    """
+    drivers = [Driver() for _ in range(3)]
+    for i, driver in enumerate(drivers):
+        pool.register(i, driver)
+        pool.release(driver)
+    pool.purge(all_drivers=True)
+    assert all(d.finalized for d in drivers)
+    assert pool.idle_count() == 0
+
+
+def test_default_health_check():
+    """Test the attributes looked up by the default health check.
+
+    """
+    assert default_health_check(object())
+    assert default_health_check(Driver())
+    assert not default_health_check(Driver(connected=False))
+
+    class Initialized(object):
+        def initialized(self):
+            return False
+
+    assert not default_health_check(Initialized())
+
+
+def test_single_purge_timer(pool):
+    """A single timer is running whatever the number of released drivers.
+
+    """
+    drivers = [Driver() for _ in range(3)]
+    timers = set()
+    for driver in drivers:
+        pool.register('a', driver)
+        pool.release(driver)
+        timers.add(pool._timer)
+    assert len(timers) == 1
+    pool.shutdown()
+
+
+def test_idle_drivers_expire():
+    """Idle drivers are finalized once the timeout expired.
+
+    """
+    pool = DriverPool(idle_timeout=0.01)
+    driver = Driver()
+    pool.register('a', driver)
+    pool.release(driver)
+    for _ in range(200):
+        if driver.finalized:
+            break
+        sleep(0.01)
+    assert driver.finalized
+    assert pool.idle_count() == 0
+
+
+def test_shutdown(pool):
+    """Shutting down the pool finalizes the idle drivers and stops pooling.
+
+    """
+    idle, used = Driver(), Driver()
+    pool.register('a', idle)
+    pool.register('a', used)
+    pool.release(idle)
+    pool.shutdown()
+    assert idle.finalized
+    assert pool._timer is None
+
+    assert not pool.release(used)
+    pool.register('a', used)
+    assert not pool.release(used)
+    assert pool.acquire('a') is None
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Test the tools running VISA drivers against simulated instruments.
+
+"""
+import os
+from time import perf_counter
+
+from exopy_i3py.instruments.starters.i3py_starters import I3pyVisaStarter
+from exopy_i3py.instruments.starters.simulation import (SIM_BACKEND,
+                                                        build_sim_backend,
+                                                        add_simulated_latency)
+
+#: Inline description of a simulated instrument.
+YAML = """spec: "1.0"
+devices:
+  device 1:
+    eom:
+      GPIB INSTR:
+        q: "\\n"
+        r: "\\n"
+    dialogues:
+      - q: "*IDN?"
+        r: "Simulated"
+resources:
+  GPIB0::8::INSTR:
+    device: device 1
+"""
+
+
+def test_default_backend():
+    """Without description the default pyvisa-sim instruments are used.
+
+    """
+    assert build_sim_backend('') == SIM_BACKEND
+    assert build_sim_backend('  ') == SIM_BACKEND
+
+
+def test_backend_from_file():
+    """A path is passed to pyvisa-sim as is.
+
+    """
+    assert build_sim_backend('instrs.yaml') == 'instrs.yaml' + SIM_BACKEND
+
+
+def test_backend_from_inline_description():
+    """Inline descriptions are written once to a file named after them.
+
+    """
+    backend = build_sim_backend(YAML)
+    assert backend.endswith(SIM_BACKEND)
+    path = backend[:-len(SIM_BACKEND)]
+    with open(path) as f:
+        assert f.read() == YAML.strip()
+
+    mtime = os.path.getmtime(path)
+    assert build_sim_backend(YAML) == backend
+    assert os.path.getmtime(path) == mtime
+
+
+class Instrument(object):
+    """Message based driver answering immediately.
+
+    """
+    def __init__(self, parameters=None, **kwargs):
+        self.parameters = parameters
+        self.kwargs = kwargs
+
+    def initialize(self):
+        pass
+
+    def finalize(self):
+        pass
+
+    def clear_cache(self):
+        pass
+
+    def write(self, msg):
+        return len(msg)
+
+    def query(self, msg):
+        return msg.upper()
+
+
+def timed(func, *args):
+    """Call a function and return its result and the time it took.
+
+    """
+    start = perf_counter()
+    res = func(*args)
+    return res, perf_counter() - start
+
+
+def test_simulated_latency():
+    """Communications are delayed and restarting does not add new delays.
+
+    """
+    instr = Instrument()
+    add_simulated_latency(instr, 0.05)
+    add_simulated_latency(instr, 0.05)
+    answer, duration = timed(instr.query, 'idn?')
+    assert answer == 'IDN?'
+    assert 0.05 <= duration < 0.09
+    assert timed(instr.write, 'a')[1] >= 0.05
+    assert not hasattr(instr, 'read')
+
+
+def test_no_latency():
+    """Without latency nor jitter the methods are left untouched.
+
+    """
+    instr = Instrument()
+    add_simulated_latency(instr, 0)
+    assert 'query' not in vars(instr)
+
+
+def test_visa_starter_with_simulation():
+    """The starter builds the simulated backend and delays the driver.
+
+    """
+    settings = {'id': 'exopy_i3py.visa_settings', 'user_id': 'sim',
+                'pyvisa_backend': SIM_BACKEND, 'sim_description': YAML,
+                'sim_latency': 0.01, 'sim_jitter': 0.0}
+    driver = I3pyVisaStarter().start(Instrument,
+                                     {'resource_name': 'GPIB0::8::INSTR'},
+                                     settings)
+    assert driver.kwargs['backend'] == build_sim_backend(YAML)
+    assert driver.kwargs['resource_name'] == 'GPIB0::8::INSTR'
+    assert driver.parameters == {}
+    assert timed(driver.query, '*idn?')[1] >= 0.01
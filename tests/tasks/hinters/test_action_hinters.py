@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Test the hinters building placeholders from the signature of the Actions.
+
+"""
+from typing import Tuple
+
+import numpy as np
+
+from exopy_i3py.tasks.hinters.action_hinters import (ArrayHint,
+                                                     ActionSignatureHinter,
+                                                     RegisterActionHinter)
+from exopy_i3py.tasks.hinters.feature_hinters import WithUnitHinter
+
+
+#: Record describing an acquisition (structured dtype).
+HEADER = [('index', np.int64), ('time', float)]
+
+#: Records of the acquired points.
+RECORDS = ArrayHint(np.int16, ('records', 'points'))
+
+#: Single trace whose length is given by an argument.
+TRACE = ArrayHint(float, 'points')
+
+
+class Action(object):
+    """Wrapper of a method storing its creation kwargs like I3py Actions.
+
+    """
+    def __init__(self, **kwargs):
+        self.creation_kwargs = kwargs
+
+    def __call__(self, func):
+        self.func = func
+        return self
+
+
+class RegisterAction(Action):
+    """Action reading a register.
+
+    """
+    pass
+
+
+class Digitizer(object):
+    """Acquisition card whose Actions return scalars, records and arrays.
+
+    """
+    def rearm(self):
+        pass
+
+    def count(self) -> int:
+        pass
+
+    def temperature(self) -> np.float32:
+        pass
+
+    def header(self) -> HEADER:
+        pass
+
+    def acquire(self, points=10, records=1, label='') -> RECORDS:
+        pass
+
+    def trace(self, points) -> TRACE:
+        pass
+
+    def spectrum(self) -> Tuple[ArrayHint(float, 4), ArrayHint(complex, 4)]:
+        pass
+
+    def stats(self) -> (float, float):
+        pass
+
+    @Action(units=(None, 'V'))
+    def offset(self) -> float:
+        pass
+
+    @Action(units=(None, ('s', None)))
+    def window(self) -> (float, int):
+        pass
+
+    @RegisterAction(names=('overflow', 'done'))
+    def read_status(self) -> int:
+        pass
+
+    mode = 'average'
+
+
+class Call(object):
+    """Instruction calling an Action with some arguments.
+
+    """
+    def __init__(self, name, ret_names=(), **action_kwargs):
+        self.id = 'dig'
+        self.path = 'driver.' + name
+        self.action_kwargs = action_kwargs
+        self.ret_names = list(ret_names)
+        self.database_entries = ({'dig_' + n: 0 for n in ret_names} or
+                                 {'dig_' + name: 0})
+
+
+def guess(name, **action_kwargs):
+    """Guess the value returned by an Action of the digitizer.
+
+    """
+    return ActionSignatureHinter().guess_value(Call(name, **action_kwargs),
+                                               Digitizer)
+
+
+def test_rating():
+    """Annotated Actions are preferred, other attributes are not rated.
+
+    """
+    rates = {name: ActionSignatureHinter.rate_hint_pertinence(Call(name),
+                                                              Digitizer)
+             for name in ('count', 'offset', 'rearm', 'mode', 'missing')}
+    assert rates == {'count': 2, 'offset': 2, 'rearm': 1, 'mode': 0,
+                     'missing': 0}
+    assert guess('rearm') is None
+    assert guess('missing') is None
+
+
+def test_scalar_placeholders():
+    """Builtin and numpy scalars are hinted by their default value.
+
+    """
+    count = guess('count')
+    assert count == 0 and type(count) is int
+    temperature = guess('temperature')
+    assert temperature == 0 and type(temperature) is np.float32
+
+
+def test_structured_placeholder():
+    """Structured dtypes are hinted by a 0d record.
+
+    """
+    header = guess('header')
+    assert header.shape == ()
+    assert header.dtype.names == ('index', 'time')
+
+
+def test_array_shape_from_arguments():
+    """Dimensions are read from the literal arguments or the defaults.
+
+    """
+    acquired = guess('acquire')
+    assert acquired.shape == (1, 10) and acquired.dtype == np.int16
+    assert guess('acquire', records='4', points='2**3').shape == (4, 10)
+    assert guess('acquire', records='4', points='256').shape == (4, 256)
+    # Formulas depending on the database are only known at runtime.
+    assert guess('acquire', points='{Loop_index}').shape == (1, 10)
+    assert guess('acquire', points='-3').shape == (1, 0)
+    assert guess('trace').shape == (1,)
+    assert guess('trace', points='None').shape == (1,)
+
+
+def test_arrays_do_not_allocate():
+    """Large placeholders are read-only views of a single element.
+
+    """
+    acquired = guess('acquire', records='1000', points='1000000')
+    assert acquired.shape == (1000, 1000000)
+    assert acquired.strides == (0, 0)
+    assert not acquired.flags.writeable
+    assert acquired.base.nbytes == acquired.itemsize
+
+
+def test_several_return_values():
+    """Tuples and typing.Tuple hint a value per element.
+
+    """
+    real, cplx = guess('spectrum')
+    assert real.shape == cplx.shape == (4,)
+    assert cplx.dtype == complex
+    assert guess('stats') == (0.0, 0.0)
+
+
+def test_return_units(monkeypatch):
+    """The last element of the units modifier is applied to the values.
+
+    """
+    monkeypatch.setattr(WithUnitHinter, 'add_unit',
+                        staticmethod(lambda value, unit: (value, unit)))
+    assert guess('offset') == (0.0, 'V')
+    assert guess('window') == ((0.0, 's'), 0)
+
+
+def test_map_on_return_names():
+    """Tuples matching the return names are distributed on the entries.
+
+    """
+    hinter = ActionSignatureHinter()
+    call = Call('stats', ret_names=('mean', 'std'))
+    assert hinter.map_hint(call, (1.0, 2.0)) == {'dig_mean': 1.0,
+                                                 'dig_std': 2.0}
+    assert hinter.map_hint(call, 1.0) == {'dig_mean': 1.0, 'dig_std': 1.0}
+    assert hinter.map_hint(Call('stats'), (1.0, 2.0)) == \
+        {'dig_stats': (1.0, 2.0)}
+
+
+def test_cache_key_tracks_arguments():
+    """Calls with different arguments do not share their hints.
+
+    """
+    hinter = ActionSignatureHinter()
+    assert (hinter.cache_key(Call('acquire', points='10')) !=
+            hinter.cache_key(Call('acquire', points='20')))
+    assert (hinter.cache_key(Call('stats', ret_names=('a', 'b'))) !=
+            hinter.cache_key(Call('stats')))
+
+
+def test_register_action():
+    """Register Actions are hinted by an empty flag of the register bits.
+
+    """
+    call = Call('read_status')
+    assert RegisterActionHinter.rate_hint_pertinence(call, Digitizer) == 3
+    assert RegisterActionHinter.rate_hint_pertinence(Call('count'),
+                                                     Digitizer) == 0
+    status = RegisterActionHinter().guess_value(call, Digitizer)
+    assert not status
+    assert [m.name for m in type(status)] == ['overflow', 'done']
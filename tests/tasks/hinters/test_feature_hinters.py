@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Test the hinters guessing the values of Features from their declaration.
+
+"""
+from enum import IntFlag
+from types import SimpleNamespace
+
+from exopy_i3py.tasks.hinters import feature_hinters
+from exopy_i3py.tasks.hinters.feature_hinters import (FEATURE_HINTERS,
+                                                      FeatureHinter,
+                                                      EnumeratedFeatureHinter,
+                                                      LimitsValidatedHinter,
+                                                      WithUnitHinter,
+                                                      RegisterHinter,
+                                                      AliasHinter)
+
+
+class Feature(object):
+    """Data descriptor storing its creation kwargs like I3py Features.
+
+    """
+    def __init__(self, **kwargs):
+        self.creation_kwargs = kwargs
+
+    def __get__(self, obj, objtype=None):
+        return self
+
+    def __set__(self, obj, value):
+        pass
+
+
+class Float(Feature):
+    """Declaration mimicking an I3py Float Feature.
+
+    """
+    pass
+
+
+class Int(Feature):
+    """Declaration mimicking an I3py Int Feature.
+
+    """
+    pass
+
+
+class Unicode(Feature):
+    """Declaration mimicking an I3py Unicode Feature.
+
+    """
+    pass
+
+
+class Register(Feature):
+    """Declaration mimicking an I3py Register Feature.
+
+    """
+    pass
+
+
+class Alias(Feature):
+    """Declaration mimicking an I3py Alias Feature.
+
+    """
+    pass
+
+
+class Limits(object):
+    """Limits object exposing its bounds like I3py IntLimitsValidator.
+
+    """
+    minimum = None
+
+    maximum = 8
+
+
+class Output(object):
+    """Subsystem whose Features alias each others and the parent ones.
+
+    """
+    voltage = Float(unit='V', limits=(-5, 5))
+
+    level = Alias(alias='voltage')
+
+    rate = Alias(alias='.frequency')
+
+    mode = Alias(alias='.trigger')
+
+
+class Generator(object):
+    """Signal generator using all the kinds of Features.
+
+    """
+    frequency = Float(unit='Hz', limits=(1e3, 2e9))
+
+    power = Float(limits='power')
+
+    averages = Int(limits=(16,))
+
+    channel = Int(limits=Limits())
+
+    waveform = Unicode(values=('SIN', 'SQU'))
+
+    trigger = Unicode(mapping={'INT': 'IMM', 'EXT': 'EXT'})
+
+    status = Register(names=('ready', None, 'error'))
+
+    events = Register(names={'done': 3})
+
+    noname = Register()
+
+    ping = Alias(alias='pong')
+
+    pong = Alias(alias='ping')
+
+    dangling = Alias(alias='missing')
+
+    output = Output
+
+    def reset(self):
+        pass
+
+
+def instr(path):
+    """Minimal stand-in for an instruction pointing to a path.
+
+    """
+    return SimpleNamespace(path='driver.' + path)
+
+
+def best_hinter(path):
+    """The hinter rating the Feature the highest.
+
+    """
+    return max(FEATURE_HINTERS,
+               key=lambda h: h.rate_hint_pertinence(instr(path), Generator))
+
+
+def test_hinter_selection():
+    """Each Feature is handled by the most specialized hinter.
+
+    """
+    expected = {'frequency': WithUnitHinter,
+                'power': FeatureHinter,
+                'averages': LimitsValidatedHinter,
+                'channel': LimitsValidatedHinter,
+                'waveform': EnumeratedFeatureHinter,
+                'trigger': EnumeratedFeatureHinter,
+                'status': RegisterHinter,
+                'ping': AliasHinter,
+                'output.level': AliasHinter}
+    for path, hinter_cls in expected.items():
+        assert best_hinter(path) is hinter_cls, path
+
+
+def test_not_a_feature():
+    """Actions and unknown paths are not rated and get no guess.
+
+    """
+    for path in ('reset', 'output', 'missing'):
+        for hinter_cls in FEATURE_HINTERS:
+            assert not hinter_cls.rate_hint_pertinence(instr(path), Generator)
+        assert FeatureHinter().guess_value(instr(path), Generator) is None
+
+
+def test_default_value():
+    """Features with dynamic limits get the default value of their type.
+
+    """
+    value = FeatureHinter().guess_value(instr('power'), Generator)
+    assert value == 0.0 and type(value) is float
+    assert LimitsValidatedHinter().guess_value(instr('power'),
+                                               Generator) == 0.0
+
+
+def test_enumerated_values():
+    """The first declared value (or mapping key) is used.
+
+    """
+    hinter = EnumeratedFeatureHinter()
+    assert hinter.guess_value(instr('waveform'), Generator) == 'SIN'
+    assert hinter.guess_value(instr('trigger'), Generator) in ('INT', 'EXT')
+
+
+def test_static_limits():
+    """The minimum is used, the maximum if no minimum is known.
+
+    """
+    hinter = LimitsValidatedHinter()
+    value = hinter.guess_value(instr('averages'), Generator)
+    assert value == 16 and type(value) is int
+    assert hinter.guess_value(instr('channel'), Generator) == 8
+
+
+def test_unit_without_quantities():
+    """Without unit support in I3py the plain float is returned.
+
+    """
+    assert feature_hinters.i3py_unit is None
+    value = WithUnitHinter().guess_value(instr('frequency'), Generator)
+    assert value == 1e3 and type(value) is float
+
+
+def test_unit_with_quantities(monkeypatch):
+    """A quantity is built when I3py returns quantities.
+
+    """
+    registry = SimpleNamespace(Quantity=lambda value, unit: (value, unit))
+    unit = SimpleNamespace(UNIT_SUPPORT=True, UNIT_RETURN=True,
+                           get_unit_registry=lambda: registry)
+    monkeypatch.setattr(feature_hinters, 'i3py_unit', unit)
+    hinter = WithUnitHinter()
+    assert hinter.guess_value(instr('frequency'), Generator) == (1e3, 'Hz')
+
+    monkeypatch.setattr(unit, 'UNIT_RETURN', False)
+    assert hinter.guess_value(instr('frequency'), Generator) == 1e3
+
+
+def test_register_flag():
+    """Registers are hinted by an empty flag whose members are the bits.
+
+    """
+    hinter = RegisterHinter()
+    status = hinter.guess_value(instr('status'), Generator)
+    assert isinstance(status, IntFlag) and not status
+    assert type(status).__name__ == 'status'
+    assert [(m.name, m.value) for m in type(status)] == \
+        [('ready', 1), ('error', 4)]
+
+    events = hinter.guess_value(instr('events'), Generator)
+    assert type(events).done.value == 8
+    assert hinter.guess_value(instr('noname'), Generator) == 0
+
+
+def test_alias_resolution():
+    """Aliases are resolved relative to their owner, leading dots accessing
+    its parents, and the target is hinted by the most pertinent hinter.
+
+    """
+    hinter = AliasHinter()
+    assert hinter.guess_value(instr('output.level'), Generator) == -5.0
+    assert hinter.guess_value(instr('output.rate'), Generator) == 1e3
+    assert hinter.guess_value(instr('output.mode'), Generator) in ('INT',
+                                                                   'EXT')
+
+
+def test_alias_to_nowhere():
+    """Cyclic aliases and missing targets get no guess.
+
+    """
+    hinter = AliasHinter()
+    assert hinter.guess_value(instr('ping'), Generator) is None
+    assert hinter.guess_value(instr('dangling'), Generator) is None
+    assert hinter.guess_value(instr('missing'), Generator) is None
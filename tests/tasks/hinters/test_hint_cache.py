@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Test the cache of the values provided by the hinters.
+
+"""
+from exopy_i3py.tasks.hinters import hint_cache
+from exopy_i3py.tasks.hinters.hint_cache import (get_hint, set_hint,
+                                                 clear_hint_cache, _MISSING)
+
+
+class Driver(object):
+    """Driver class used as cache owner.
+
+    """
+    pass
+
+
+def test_hint_cache_lru(monkeypatch):
+    """The least recently used hints are discarded once the cache is full.
+
+    """
+    monkeypatch.setattr(hint_cache, 'HINT_CACHE_SIZE', 3)
+    for i in range(3):
+        set_hint(Driver, i, i)
+    assert get_hint(Driver, 0) == 0
+    set_hint(Driver, 3, 3)
+    assert get_hint(Driver, 1) is _MISSING
+    assert [get_hint(Driver, i) for i in (0, 2, 3)] == [0, 2, 3]
+    clear_hint_cache(Driver)
+    assert get_hint(Driver, 0) is _MISSING
+
+
+def test_hint_cache_unhashable_key():
+    """Unhashable keys are simply not cached.
+
+    """
+    set_hint(Driver, [1], 1)
+    assert get_hint(Driver, [1]) is _MISSING
+    clear_hint_cache()
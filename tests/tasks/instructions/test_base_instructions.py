@@ -1,2 +1,237 @@
 # -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Test the base instructions.
 
+"""
+import gc
+from collections import OrderedDict
+from weakref import ref
+
+from exopy_i3py.tasks.instructions.accessors import clear_resolution_cache
+from exopy_i3py.tasks.instructions.base_instructions import (GetInstruction,
+                                                             SetInstruction)
+
+
+class Channel(object):
+    """Channel of the drivers used in the tests.
+
+    """
+    def __init__(self, ch_id):
+        self.id = ch_id
+        self.value = ch_id
+
+
+class Driver(object):
+    """Driver exposing a few channels.
+
+    """
+    def __init__(self):
+        self.ch = {i: Channel(i) for i in range(3)}
+
+
+class SlottedDriver(object):
+    """Driver which cannot be weakly referenced.
+
+    """
+    __slots__ = ('ch',)
+
+    def __init__(self):
+        self.ch = {i: Channel(i) for i in range(3)}
+
+
+def make_instruction(ch_ids):
+    """Build a prepared instruction reading a channel value.
+
+    """
+    instr = GetInstruction(id='v', path='driver.ch[a].value',
+                           ch_ids=OrderedDict(ch_ids))
+    instr.prepare()
+    return instr
+
+
+def test_resolution_cache_distinguishes_channel_ids_names():
+    """Instructions sharing the parent path but not the channel ids names
+    should not share the resolved objects.
+
+    """
+    driver = Driver()
+    # Both instructions have the channel ids values (1, 2) once sorted by
+    # names but do not address the same channel.
+    first = make_instruction([('a', '1'), ('z', '2')])
+    second = make_instruction([('_', '1'), ('a', '2')])
+
+    assert first._resolve_parent(driver, first._eval_ch_ids(None)) is \
+        driver.ch[1]
+    assert second._resolve_parent(driver, second._eval_ch_ids(None)) is \
+        driver.ch[2]
+
+
+def test_resolution_without_weak_reference():
+    """Drivers which cannot be weakly referenced are resolved without cache.
+
+    """
+    driver = SlottedDriver()
+    instr = make_instruction([('a', '1')])
+    assert instr._resolve_parent(driver, {'a': 1}) is driver.ch[1]
+    assert instr.access(None, driver, {'a': 2}) == 2
+
+
+def test_resolution_does_not_keep_driver_alive():
+    """Once its connection is closed, a driver can be collected even if an
+    instruction used it.
+
+    """
+    driver = Driver()
+    instr = make_instruction([('a', '1')])
+    assert instr._resolve_parent(driver, {'a': 1}) is driver.ch[1]
+
+    driver_ref = ref(driver)
+    clear_resolution_cache(driver)
+    del driver
+    gc.collect()
+    assert driver_ref() is None
+
+    other = Driver()
+    assert instr._resolve_parent(other, {'a': 1}) is other.ch[1]
+
+
+def test_metadata_shared_at_construction():
+    """Instructions using the same path share their metadata before being
+    prepared.
+
+    """
+    first = GetInstruction(path='driver.ch[a].value',
+                           ch_ids=OrderedDict(a='1'))
+    second = GetInstruction(path='driver.ch[a].value',
+                            ch_ids=OrderedDict(a='2'))
+    assert first._meta is second._meta
+
+    second.ch_ids = OrderedDict(b='2')
+    assert first._meta is not second._meta
+    second.path = 'driver.ch[b].value'
+    assert second._meta.ch_names == ('b',)
+
+
+def test_resolution_state_shared():
+    """The resolution cache of the driver is remembered by the metadata and
+    not by each instruction.
+
+    """
+    driver = Driver()
+    first = make_instruction([('a', '1')])
+    second = make_instruction([('a', '2')])
+    first._resolve_parent(driver, {'a': 1})
+    cache = first._meta.resolution_cache(driver)
+    assert cache is second._meta.resolution_cache(driver)
+
+    assert second._resolve_parent(driver, {'a': 2}) is driver.ch[2]
+    assert len(cache) == 2
+    assert not hasattr(second, '_resolved')
+
+
+def test_check_refreshes_metadata():
+    """Editing the channel ids in place does not leave stale metadata once
+    the instruction is checked.
+
+    """
+    instr = GetInstruction(id='v', path='driver.ch[a].value',
+                           ch_ids=OrderedDict(a='1'))
+    instr.ch_ids['b'] = '2'
+    assert instr._meta.ch_names == ('a',)
+
+    instr.check(None, Driver)
+    assert instr._meta.ch_names == ('a', 'b')
+
+
+class Supply(object):
+    """Power supply caching the values set on it, as i3py drivers do.
+
+    """
+    def __init__(self, **cache):
+        self._cache = cache
+        self.sets = []
+
+    @property
+    def voltage(self):
+        return self._cache.get('voltage', 0.0)
+
+    @voltage.setter
+    def voltage(self, value):
+        self.sets.append(value)
+        self._cache['voltage'] = value
+
+    @property
+    def mode(self):
+        return self._cache.get('mode')
+
+    @mode.setter
+    def mode(self, value):
+        self.sets.append(value)
+        self._cache['mode'] = value
+
+
+def set_values(supply, path, values, **kwargs):
+    """Execute a Set instruction for each value and return the instruction.
+
+    """
+    instr = SetInstruction(id='s', path=path, value='0', skip_unchanged=True,
+                           **kwargs)
+    instr.prepare()
+    for value in values:
+        instr.access(None, supply, ({}, value))
+    return instr
+
+
+def test_set_skipped_when_cached():
+    """Values already held by the driver cache are not written again.
+
+    """
+    supply = Supply(voltage=1.0)
+    instr = set_values(supply, 'driver.voltage', [1.0, 2.0, 2.0])
+    assert supply.sets == [2.0]
+    assert instr.skipped_writes == 2
+
+    instr.prepare()
+    assert instr.skipped_writes == 0
+
+
+def test_set_skip_tolerances():
+    """Real values are compared using the tolerances of the instruction.
+
+    """
+    supply = Supply(voltage=1.0)
+    set_values(supply, 'driver.voltage', [1.05], abs_tol=0.1)
+    set_values(supply, 'driver.voltage', [1.05], rel_tol=0.1)
+    assert supply.sets == []
+
+    set_values(supply, 'driver.voltage', [1.05])
+    assert supply.sets == [1.05]
+
+
+def test_set_not_skipped():
+    """Values are written when skipping is disabled, when the cache does not
+    hold the value or when the values cannot be compared.
+
+    """
+    supply = Supply(voltage=1.0)
+    instr = SetInstruction(id='s', path='driver.voltage', value='1.0')
+    instr.prepare()
+    instr.access(None, supply, ({}, 1.0))
+    assert supply.sets == [1.0]
+
+    set_values(supply, 'driver.mode', ['CC', 'CV'])
+    assert supply.sets == [1.0, 'CC', 'CV']
+
+    class Uncomparable(object):
+        def __eq__(self, other):
+            raise ValueError()
+
+    supply = Supply(mode=Uncomparable())
+    set_values(supply, 'driver.mode', ['CC'])
+    assert supply.sets == ['CC']
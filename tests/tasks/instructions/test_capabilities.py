@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Test the index of the capabilities of driver classes.
+
+"""
+import gc
+from weakref import ref
+
+from exopy_i3py.tasks.instructions.capabilities import (get_capabilities,
+                                                        clear_capabilities)
+
+
+class Float(object):
+    """Declaration mimicking an I3py Float Feature.
+
+    """
+    def __init__(self, **kwargs):
+        self.creation_kwargs = kwargs
+
+    def __get__(self, obj, objtype=None):
+        return self
+
+    def __set__(self, obj, value):
+        pass
+
+
+class Unicode(Float):
+    """Declaration mimicking an I3py Unicode Feature.
+
+    """
+    pass
+
+
+class ChannelContainer(object):
+    """Declaration of channels exposing the class and the ids of the channels.
+
+    """
+    def __init__(self, cls, available):
+        self.cls = cls
+        self.available = available
+
+
+class Output(object):
+    """Channel of the multi-output source.
+
+    """
+    amplitude = Float(unit='V', limits=(0, 10))
+
+    def arm(self):
+        pass
+
+
+class Trigger(object):
+    """Subsystem declared through the __subsystems__ mapping.
+
+    """
+    source = Unicode(mapping={'INT': 'IMM', 'EXT': 'EXT'})
+
+
+class Source(object):
+    """Multi-output source declaring its Features like I3py drivers.
+
+    """
+    __feats__ = {'frequency': Float(unit='Hz'),
+                 'mode': Unicode(values=('CW', 'SWEEP'))}
+    __subsystems__ = {'trigger': Trigger}
+
+    frequency = None
+
+    mode = None
+
+    trigger = Trigger
+
+    outputs = ChannelContainer(Output, (1, 2))
+
+    timeout = 10
+
+    def reset(self):
+        pass
+
+
+def test_index_structure():
+    """Each attribute gets a node of the proper kind.
+
+    """
+    index = get_capabilities(Source)
+    kinds = {n.path: n.kind for n in index.iter_nodes()}
+    assert kinds == {'driver': 'driver',
+                     'driver.frequency': 'feature',
+                     'driver.mode': 'feature',
+                     'driver.outputs': 'channel',
+                     'driver.outputs.amplitude': 'feature',
+                     'driver.outputs.arm': 'action',
+                     'driver.reset': 'action',
+                     'driver.timeout': 'attribute',
+                     'driver.trigger': 'subsystem',
+                     'driver.trigger.source': 'feature'}
+    assert [n.path for n in index.iter_nodes('action')] == \
+        ['driver.outputs.arm', 'driver.reset']
+
+
+def test_feature_description():
+    """The type, unit, limits and values are extracted from the declaration.
+
+    """
+    index = get_capabilities(Source)
+    amplitude = index.lookup('driver.outputs[ch].amplitude')
+    assert amplitude.value_type is float
+    assert (amplitude.unit, amplitude.limits) == ('V', (0, 10))
+
+    assert index.lookup('driver.mode').values == ('CW', 'SWEEP')
+    source = index.lookup('driver.trigger.source')
+    assert source.value_type is str
+    assert set(source.values) == {'INT', 'EXT'}
+    assert index.lookup('driver.outputs').available == (1, 2)
+    assert index.lookup('driver.outputs.missing') is None
+
+
+def test_check_paths():
+    """Paths are validated against the index and the channel ids names.
+
+    """
+    index = get_capabilities(Source)
+    assert index.check('driver.outputs[ch].amplitude', ['ch']) == (True, '')
+    # Attributes past the indexed part are found by plain introspection.
+    assert index.check('driver.timeout.real', []) == (True, '')
+
+    for path, ch_ids, error in [('instr.mode', [], 'should start by'),
+                                ('driver.outputs[ch.arm', ['ch'],
+                                 'Malformed'),
+                                ('driver.outputs[ch].arm', [], 'Unknown'),
+                                ('driver.trigger.slope', [],
+                                 'Source.trigger has no attribute slope')]:
+        test, msg = index.check(path, ch_ids)
+        assert not test
+        assert error in msg
+
+
+def test_complete():
+    """Completions are the children matching the beginning of the name.
+
+    """
+    index = get_capabilities(Source)
+    assert index.complete('driver.outputs[1].a') == \
+        ['driver.outputs[1].amplitude', 'driver.outputs[1].arm']
+    assert index.complete('driver.t') == ['driver.timeout', 'driver.trigger']
+    assert index.complete('driver.nothing.a') == []
+
+
+def test_cyclic_structure():
+    """Classes referencing themselves are indexed only once per branch.
+
+    """
+    class Node(object):
+        pass
+
+    Node.child = Node
+    index = get_capabilities(Node)
+    assert index.lookup('driver.child').kind == 'subsystem'
+    assert not index.lookup('driver.child').children
+
+
+def test_index_cache():
+    """The index is built once per class and discarded with the class.
+
+    """
+    class Driver(Source):
+        def configure(self):
+            super().reset()
+
+    index = get_capabilities(Driver)
+    assert get_capabilities(Driver) is index
+    assert 'configure' in index.root.children
+    assert 'configure' not in get_capabilities(Source).root.children
+
+    clear_capabilities(Driver)
+    assert get_capabilities(Driver) is not index
+
+    # The method using super references the class, which must not prevent
+    # its collection.
+    driver_ref = ref(Driver)
+    del Driver, index
+    gc.collect()
+    assert driver_ref() is None
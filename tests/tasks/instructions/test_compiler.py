@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Test the generation of the function performing a list of instructions.
+
+"""
+from collections import OrderedDict
+from threading import Event
+
+from exopy_i3py.tasks.instructions.base_instructions import (BaseInstruction,
+                                                             GetInstruction,
+                                                             SetInstruction)
+from exopy_i3py.tasks.instructions.compiler import (PerformCompiler,
+                                                    parse_path)
+
+
+class Channel(object):
+    """Channel of the drivers used in the tests.
+
+    """
+    def __init__(self, value):
+        self.value = value
+
+
+class Driver(object):
+    """Driver exposing a few channels.
+
+    """
+    def __init__(self):
+        self.ch = {i: Channel(float(i)) for i in range(3)}
+
+
+class Task(object):
+    """Task whose database is a simple dictionary.
+
+    """
+    name = 'Test'
+
+    def __init__(self):
+        self.database = {}
+        self.root = self
+        self.should_stop = Event()
+
+    def write_in_database(self, name, value):
+        self.database[self.name + '_' + name] = value
+
+    def get_from_database(self, name):
+        return self.database[name]
+
+
+class Counter(object):
+    """Callable returning a new value at each call.
+
+    """
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return float(self.calls)
+
+
+class Recorder(BaseInstruction):
+    """Instruction recording the database when executed.
+
+    """
+    def execute(self, task, driver):
+        task.write_in_database('v', 10.0)
+
+
+def make_instruction(cls, ch, **kwargs):
+    """Build a prepared instruction accessing the value of a channel.
+
+    """
+    instr = cls(path='driver.ch[a].value', ch_ids=OrderedDict(a=str(ch)),
+                **kwargs)
+    instr.prepare()
+    return instr
+
+
+def compile_and_run(instructions):
+    """Compile the instructions and run them on a new driver.
+
+    """
+    task = Task()
+    compiler = PerformCompiler(task=task)
+    perform = compiler.compile(instructions)
+    driver = Driver()
+    perform(task, driver)
+    return compiler, task, driver
+
+
+def test_parse_path():
+    """Test splitting a path in access operations.
+
+    """
+    assert parse_path('driver.output[ch].voltage') == [('attr', 'output'),
+                                                       ('item', 'ch'),
+                                                       ('attr', 'voltage')]
+
+
+def test_compiled_perform():
+    """The generated function gives the same results as executing the
+    instructions in turn.
+
+    """
+    instructions = [make_instruction(GetInstruction, 1, id='v'),
+                    make_instruction(SetInstruction, 2, id='s',
+                                     value='{Test_v} + 1'),
+                    make_instruction(GetInstruction, 2, id='w')]
+    _, task, driver = compile_and_run(instructions)
+
+    seq_task, seq_driver = Task(), Driver()
+    for i in instructions:
+        i.execute(seq_task, seq_driver)
+
+    assert task.database == seq_task.database == {'Test_v': 1.0,
+                                                  'Test_w': 2.0}
+    assert driver.ch[2].value == seq_driver.ch[2].value == 2.0
+
+
+def test_shared_accesses():
+    """Common prefixes of the paths are accessed only once.
+
+    """
+    instructions = [make_instruction(GetInstruction, 1, id='v'),
+                    make_instruction(GetInstruction, 1, id='w')]
+    compiler, task, _ = compile_and_run(instructions)
+    assert len([line for line in compiler.lines
+                if '= driver.ch' in line]) == 1
+    assert task.database == {'Test_v': 1.0, 'Test_w': 1.0}
+
+
+def test_written_entries_invalidate_evaluations():
+    """Values depending on entries written in between are evaluated again.
+
+    """
+    instructions = [make_instruction(GetInstruction, 1, id='v'),
+                    make_instruction(SetInstruction, 0, id='s',
+                                     value='{Test_v}*2'),
+                    make_instruction(GetInstruction, 2, id='v'),
+                    make_instruction(SetInstruction, 1, id='s',
+                                     value='{Test_v}*2')]
+    _, _, driver = compile_and_run(instructions)
+    assert driver.ch[0].value == 2.0
+    assert driver.ch[1].value == 4.0
+
+
+def test_fallback():
+    """Instructions unable to generate code are executed and discard the
+    evaluations.
+
+    """
+    recorder = Recorder(id='r', path='driver.ch[a].value',
+                        ch_ids=OrderedDict(a='0'))
+    recorder.prepare()
+    instructions = [make_instruction(SetInstruction, 0, id='s',
+                                     value='{Test_v}'),
+                    recorder,
+                    make_instruction(SetInstruction, 1, id='s',
+                                     value='{Test_v}')]
+    task = Task()
+    task.database['Test_v'] = 5.0
+    perform = PerformCompiler(task=task).compile(instructions)
+    driver = Driver()
+    perform(task, driver)
+    assert driver.ch[0].value == 5.0
+    assert driver.ch[1].value == 10.0
+
+
+def test_expressions_without_entries_are_not_shared():
+    """Expressions not depending on the database are evaluated for each
+    instruction, as they may not return the same value twice.
+
+    """
+    counter = Counter()
+    instructions = [make_instruction(SetInstruction, i, id='s',
+                                     value='counter()')
+                    for i in range(2)]
+    for instr in instructions:
+        instr._value_expr.namespace['counter'] = counter
+    _, _, driver = compile_and_run(instructions)
+    assert counter.calls == 2
+    assert driver.ch[0].value == 1.0
+    assert driver.ch[1].value == 2.0
+
+
+def test_stop_between_instructions():
+    """The function returns as soon as the root task is asked to stop.
+
+    """
+    class Stopper(BaseInstruction):
+
+        def execute(self, task, driver):
+            task.root.should_stop.set()
+
+    instructions = [make_instruction(GetInstruction, 1, id='v'), Stopper(),
+                    make_instruction(GetInstruction, 2, id='w')]
+    _, task, _ = compile_and_run(instructions)
+    assert task.database == {'Test_v': 1.0}
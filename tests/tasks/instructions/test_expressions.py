@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Test the expressions compiled ahead of their evaluation.
+
+"""
+import pytest
+
+from exopy_i3py.tasks.instructions.expressions import (compile_expression,
+                                                       ConstantExpression,
+                                                       EntryExpression,
+                                                       EvalExpression)
+
+
+class Task(object):
+    """Task whose database is a simple dictionary.
+
+    """
+    def __init__(self, **entries):
+        self.entries = entries
+
+    def get_from_database(self, name):
+        return self.entries[name]
+
+
+@pytest.mark.parametrize('source, value', [('1', 1), (' 2.5 ', 2.5),
+                                           ('"a"', 'a'), ('(1, 2)', (1, 2))])
+def test_constant_expression(source, value):
+    """Literals are folded at compilation time.
+
+    """
+    expr = compile_expression(source)
+    assert isinstance(expr, ConstantExpression)
+    assert expr.is_constant
+    assert expr.entries == ()
+    assert expr(None) == value
+
+
+def test_entry_expression():
+    """A single reference is read from the database without evaluation.
+
+    """
+    expr = compile_expression(' {Test_a} ')
+    assert isinstance(expr, EntryExpression)
+    assert not expr.is_constant
+    assert expr.entries == ('Test_a',)
+    assert expr(Task(Test_a=[1])) == [1]
+
+
+def test_eval_expression():
+    """Other expressions are evaluated with the entries as locals.
+
+    """
+    expr = compile_expression('{Test_a} + 2*{Test_b} - { Test_a }')
+    assert isinstance(expr, EvalExpression)
+    assert expr.entries == ('Test_a', 'Test_b')
+    assert expr(Task(Test_a=1, Test_b=3)) == 6
+    assert expr(Task(Test_a=4, Test_b=1)) == 2
+
+
+def test_eval_expression_without_entries():
+    """Expressions which are not literals are evaluated at each call.
+
+    """
+    expr = compile_expression('1 + 1')
+    assert isinstance(expr, EvalExpression)
+    assert expr.entries == ()
+    assert expr(Task()) == 2
+
+
+def test_invalid_expression():
+    """Invalid expressions are reported at compilation time.
+
+    """
+    with pytest.raises(SyntaxError):
+        compile_expression('{Test_a} +')
@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Test the instruction reading several Features at once.
+
+"""
+from threading import RLock
+
+from exopy_i3py.tasks.instructions.get_many_instruction import\
+    GetManyInstruction
+
+
+class Query(object):
+    """Feature answering a query command, as i3py Features do.
+
+    """
+    def __init__(self, getter):
+        self.creation_kwargs = {'getter': getter}
+        self.name = ''
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return self.post_get(obj, obj.query(self.creation_kwargs['getter']))
+
+    def pre_get(self, obj):
+        obj.pre_gets.append(self.name)
+
+    def post_get(self, obj, value):
+        return float(value)
+
+
+class Source(object):
+    """Message based instrument answering from a table of commands.
+
+    Joined commands are answered by joining the individual answers, unless
+    the instrument is made to drop the last one.
+
+    """
+    frequency = Query('FREQ?')
+
+    power = Query('POW?')
+
+    #: Feature whose command depends on the state of the instrument.
+    level = Query('LEV{ch}?')
+
+    answers = {'FREQ?': '1e9', 'POW?': '-10', 'LEV{ch}?': '0.5'}
+
+    def __init__(self, truncate=False):
+        self.lock = RLock()
+        self.queries = []
+        self.pre_gets = []
+        self.truncate = truncate
+
+    def query(self, msg):
+        self.queries.append(msg)
+        answers = [self.answers[c] for c in msg.split(';')]
+        if self.truncate and len(answers) > 1:
+            answers = answers[:-1]
+        return ';'.join(answers)
+
+
+class Task(object):
+    """Task collecting the values written by the instruction.
+
+    """
+    def __init__(self):
+        self.values = {}
+
+    def write_in_database(self, name, value):
+        self.values[name] = value
+
+
+def run(source, features, times=1, **kwargs):
+    """Execute a GetMany instruction on the source and return the database.
+
+    """
+    instr = GetManyInstruction(id='src', path='driver', features=features,
+                               **kwargs)
+    instr.prepare()
+    task = Task()
+    for _ in range(times):
+        instr.execute(task, source)
+    return task.values
+
+
+def test_coalesced_read():
+    """Static getters are joined in a single query whose answer is parsed by
+    each Feature.
+
+    """
+    source = Source()
+    values = run(source, ['frequency', 'power'])
+    assert source.queries == ['FREQ?;POW?']
+    assert source.pre_gets == ['frequency', 'power']
+    assert values == {'src_frequency': 1e9, 'src_power': -10.0}
+
+
+def test_no_coalescing_requested():
+    """The Features are read one by one if coalescing is disabled.
+
+    """
+    source = Source()
+    assert run(source, ['frequency', 'power'], coalesce=False) == \
+        {'src_frequency': 1e9, 'src_power': -10.0}
+    assert source.queries == ['FREQ?', 'POW?']
+
+
+def test_fallback_for_dynamic_getter():
+    """Getters depending on the instrument state prevent coalescing.
+
+    """
+    source = Source()
+    values = run(source, ['frequency', 'level'], times=2)
+    assert source.queries == ['FREQ?', 'LEV{ch}?']*2
+    assert values == {'src_frequency': 1e9, 'src_level': 0.5}
+
+
+def test_fallback_on_unparsable_answer():
+    """A malformed answer disables coalescing for the rest of the run and the
+    Features are read one by one.
+
+    """
+    source = Source(truncate=True)
+    values = run(source, ['frequency', 'power'], times=2)
+    assert source.queries == ['FREQ?;POW?', 'FREQ?', 'POW?', 'FREQ?', 'POW?']
+    assert values == {'src_frequency': 1e9, 'src_power': -10.0}
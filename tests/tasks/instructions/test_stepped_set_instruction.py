@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Test the instruction ramping the value of a Feature.
+
+"""
+from threading import Event
+from time import monotonic
+
+import pytest
+
+from exopy_i3py.tasks.hinters.base_hinters import BaseInstructionReturnHinter
+from exopy_i3py.tasks.instructions.stepped_set_instruction import\
+    SteppedSetInstruction
+
+
+class Driver(object):
+    """Driver recording the time at which its value is set.
+
+    """
+    def __init__(self, value):
+        self._value = value
+        self.writes = []
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self.writes.append((monotonic(), value))
+        self._value = value
+
+
+class Task(object):
+    """Minimal task providing the stop event of the root.
+
+    """
+    def __init__(self):
+        self.root = self
+        self.should_stop = Event()
+
+
+class Float(object):
+    """Descriptor mimicking an I3py Float Feature.
+
+    """
+    creation_kwargs = {}
+
+    def __get__(self, obj, objtype=None):
+        return 0.0
+
+    def __set__(self, obj, value):
+        pass
+
+
+class Str(Float):
+    """Descriptor mimicking an I3py Str Feature.
+
+    """
+    pass
+
+
+class DriverClass(object):
+    """Driver class declaring Features of different types.
+
+    """
+    level = Float()
+
+    mode = Str()
+
+
+def ramp(driver, value, step, rate, **kwargs):
+    """Execute a stepped set and return the time at which it started.
+
+    """
+    instr = SteppedSetInstruction(id='v', path='driver.value',
+                                  value=value, step=step, rate=rate, **kwargs)
+    instr.prepare()
+    start = monotonic()
+    instr.execute(Task(), driver)
+    return start
+
+
+def test_compute_ramp():
+    """Test computing the values of a ramp.
+
+    """
+    assert SteppedSetInstruction.compute_ramp(0, 1, 0.25) == \
+        pytest.approx([0.25, 0.5, 0.75, 1])
+    assert SteppedSetInstruction.compute_ramp(0, 0.1, 0.25) == [0.1]
+    assert SteppedSetInstruction.compute_ramp(0, 1, 0) == [1]
+
+
+def test_ramp_rate():
+    """Each write is delayed so that the rate holds from the current value.
+
+    """
+    driver = Driver(0.0)
+    start = ramp(driver, '1.0', '0.5', '10')
+    times = [t for t, _ in driver.writes]
+    assert [v for _, v in driver.writes] == [0.5, 1.0]
+    assert times[0] - start >= 0.05
+    assert times[1] - start >= 0.1
+
+
+def test_single_step_ramp_rate():
+    """The rate is respected by ramps made of a single step.
+
+    """
+    driver = Driver(0.0)
+    start = ramp(driver, '0.2', '1', '2')
+    assert [v for _, v in driver.writes] == [0.2]
+    assert driver.writes[0][0] - start >= 0.1
+
+
+def test_skip_unchanged():
+    """The ramp is skipped when the cache holds the target value.
+
+    """
+    driver = Driver(0.0)
+    driver._cache = {'value': 0.95}
+    ramp(driver, '1.0', '0.5', '', skip_unchanged=True, abs_tol=0.1)
+    assert driver.writes == []
+
+    ramp(driver, '1.0', '0.5', '', skip_unchanged=True)
+    assert [v for _, v in driver.writes] == [0.5, 1.0]
+
+
+@pytest.mark.parametrize('path, valid', [('driver.level', True),
+                                         ('driver.mode', False)])
+def test_check_feature_type(path, valid):
+    """Only Features holding floats can be ramped.
+
+    """
+    instr = SteppedSetInstruction(id='v', path=path, value='1.0', step='0.1',
+                                  hinter=BaseInstructionReturnHinter())
+    test, res = instr.check(None, DriverClass)
+    assert test is valid
+    if not valid:
+        assert 'str' in res
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Test the memoized validation of the paths of the instructions.
+
+"""
+import gc
+
+from exopy_i3py.tasks.instructions.validation import (check_path,
+                                                      path_cache_info,
+                                                      clear_path_cache)
+
+
+def new_driver_class():
+    """Create a driver class unknown to the caches.
+
+    """
+    class Output(object):
+        voltage = 0.0
+
+    class Driver(object):
+        output = Output
+
+        def fire(self):
+            pass
+
+    return Driver
+
+
+def delta(before):
+    """Hits and misses since the given statistics were taken.
+
+    """
+    after = path_cache_info()
+    return after['hits'] - before['hits'], after['misses'] - before['misses']
+
+
+def test_results_memoized():
+    """Checking the same path again is served from the cache, whatever the
+    order of the channel ids names.
+
+    """
+    driver_cls = new_driver_class()
+    before = path_cache_info()
+    assert check_path('driver.output[a].voltage', driver_cls, ['a', 'b'])[0]
+    assert check_path('driver.output[a].voltage', driver_cls, ['b', 'a'])[0]
+    assert delta(before) == (1, 1)
+
+    test, msg = check_path('driver.output[a].voltage', driver_cls, ['b'])
+    assert not test and 'Unknown channel id a' in msg
+    assert delta(before) == (1, 2)
+
+
+def test_clear_after_class_modification():
+    """Results are stale until the cache of the modified class is cleared,
+    the results of the other classes being kept.
+
+    """
+    driver_cls, other_cls = new_driver_class(), new_driver_class()
+    for cls in (driver_cls, other_cls):
+        assert check_path('driver.fire', cls, ())[0]
+
+    del driver_cls.fire
+    assert check_path('driver.fire', driver_cls, ())[0]
+
+    clear_path_cache(driver_cls)
+    test, msg = check_path('driver.fire', driver_cls, ())
+    assert not test and 'has no attribute fire' in msg
+
+    before = path_cache_info()
+    assert check_path('driver.fire', other_cls, ())[0]
+    assert delta(before) == (1, 0)
+
+    clear_path_cache()
+    assert path_cache_info()['size'] == 0
+
+
+def test_results_discarded_with_class():
+    """The results of a class are discarded when it is garbage collected.
+
+    """
+    clear_path_cache()
+    driver_cls = new_driver_class()
+    check_path('driver.fire', driver_cls, ())
+    check_path('driver.output.voltage', driver_cls, ())
+    assert path_cache_info()['size'] == 2
+
+    del driver_cls
+    gc.collect()
+    assert path_cache_info()['size'] == 0
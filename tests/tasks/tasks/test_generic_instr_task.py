@@ -0,0 +1,354 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Test the task executing instructions on an I3py driver.
+
+"""
+from collections import OrderedDict
+from threading import Event, current_thread
+
+import pytest
+from configobj import ConfigObj
+from exopy.tasks.api import RootTask
+from exopy.tasks.tasks.instr_task import DRIVER_DEPENDENCY_ID
+
+from exopy_i3py.tasks.tasks.generic_instr_task import (GenericI3pyTask,
+                                                       TABLE_SECTION,
+                                                       _split_in_steps)
+from exopy_i3py.tasks.instructions.base_instructions import (DEP_TYPE,
+                                                             GetInstruction,
+                                                             SetInstruction,
+                                                             CallInstruction)
+from exopy_i3py.tasks.hinters.base_hinters import (
+    BaseInstructionReturnHinter, DEP_TYPE as HINTER_DEP_TYPE)
+
+#: Dependencies needed to rebuild the tasks used in the tests.
+DEPENDENCIES = {DEP_TYPE: {'exopy_i3py.GetInstruction': GetInstruction,
+                           'exopy_i3py.SetInstruction': SetInstruction,
+                           'exopy_i3py.CallInstruction': CallInstruction},
+                HINTER_DEP_TYPE: {'exopy_i3py.BaseInstructionReturnHinter':
+                                  BaseInstructionReturnHinter}}
+
+
+def make_instruction(id):
+    """Build an instruction reading a Feature of the driver.
+
+    """
+    return GetInstruction(id=id, path='driver.' + id)
+
+
+@pytest.fixture
+def task():
+    """Task attached to a root and storing its preferences.
+
+    """
+    root = RootTask(should_stop=Event(), should_pause=Event())
+    task = GenericI3pyTask(name='Test')
+    root.add_child_task(0, task)
+    task.preferences = ConfigObj()
+    task.register_preferences()
+    return task
+
+
+def saved_ids(task):
+    """Ids of the instructions in the order of the saved sections.
+
+    """
+    prefs = task.preferences
+    sections = [s for s in prefs.sections if s.startswith('instruction_')]
+    assert sections == ['instruction_%d' % i for i in range(len(sections))]
+    return [prefs[s]['id'] for s in sections]
+
+
+def test_preferences_after_edition(task):
+    """The sections of the instructions follow the edition of the list.
+
+    """
+    task.add_instructions(0, [make_instruction(i) for i in 'abc'])
+    assert saved_ids(task) == ['a', 'b', 'c']
+
+    task.add_instruction(make_instruction('d'), 1)
+    assert saved_ids(task) == ['a', 'd', 'b', 'c']
+
+    task.add_instruction(make_instruction('e'), -1)
+    assert saved_ids(task) == ['a', 'd', 'b', 'e', 'c']
+
+    task.remove_instructions([0, 3])
+    assert saved_ids(task) == ['d', 'b', 'c']
+
+    task.move_instruction(2, 0)
+    assert saved_ids(task) == ['c', 'd', 'b']
+
+    task.move_instruction(0, 2)
+    assert saved_ids(task) == ['d', 'b', 'c']
+
+    task.remove_instruction(-1)
+    assert saved_ids(task) == ['d', 'b']
+    assert [i.id for i in task.instructions] == ['d', 'b']
+
+    # Registering the preferences anew gives the same sections.
+    task.register_preferences()
+    assert saved_ids(task) == ['d', 'b']
+
+
+def test_database_entries_of_rebuilt_task(task):
+    """The entries of the instructions of a task rebuilt from its config are
+    tracked.
+
+    """
+    task.add_instructions(0, [make_instruction(i) for i in 'abc'])
+    task.register_preferences()
+    rebuilt = GenericI3pyTask.build_from_config(task.preferences.dict(),
+                                                DEPENDENCIES)
+    assert {'a', 'b', 'c'} <= set(rebuilt.database_entries)
+
+    rebuilt.remove_instruction(0)
+    assert 'a' not in rebuilt.database_entries
+    assert {'b', 'c'} <= set(rebuilt.database_entries)
+
+    rebuilt.instructions[0].database_entries = {'d': 1.0}
+    assert 'b' not in rebuilt.database_entries
+    assert 'd' in rebuilt.database_entries
+
+    rebuilt.instructions = []
+    assert not {'c', 'd'} & set(rebuilt.database_entries)
+
+
+def test_table_round_trip(task):
+    """Instructions stored in a table are rebuilt identically.
+
+    """
+    task.serialization_format = 'table'
+    get = make_instruction('a')
+    get.hinter = BaseInstructionReturnHinter(user_value='{Test_c}')
+    instructions = [get,
+                    SetInstruction(id='b', path='driver.output[ch].voltage',
+                                   ch_ids=OrderedDict(ch='{Test_a}'),
+                                   value='1.5', skip_unchanged=True),
+                    make_instruction('c'),
+                    CallInstruction(id='d', path='driver.fire',
+                                    action_kwargs=OrderedDict(value='2'))]
+    task.add_instructions(0, instructions)
+    task.move_instruction(2, 0)
+    task.update_preferences_from_members()
+
+    prefs = task.preferences
+    assert TABLE_SECTION in prefs
+    assert not [s for s in prefs.sections if s.startswith('instruction_')]
+
+    table = prefs[TABLE_SECTION]
+    assert table['value'] == repr([None, None, '1.5', None])
+    assert table['hinter_value'] == repr([None, '{Test_c}', None, None])
+    assert table['action_kwargs'] == repr([None, None, None,
+                                           "[('value', '2')]"])
+    assert "'value'" not in table['extra']
+
+    rebuilt = GenericI3pyTask.build_from_config(prefs.dict(), DEPENDENCIES)
+    assert rebuilt.serialization_format == 'table'
+    assert ([i.preferences_from_members() for i in rebuilt.instructions] ==
+            [i.preferences_from_members() for i in task.instructions])
+    assert isinstance(rebuilt.instructions[1].hinter,
+                      BaseInstructionReturnHinter)
+    assert rebuilt.instructions[2].ch_ids == OrderedDict(ch='{Test_a}')
+
+
+class Channel(object):
+    """Channel whose value reports the mode of the driver when read.
+
+    """
+    def __init__(self, parent):
+        self.parent = parent
+        self.threads = set()
+
+    @property
+    def value(self):
+        self.threads.add(current_thread())
+        return self.parent.mode
+
+
+class Driver(object):
+    """Driver exposing a mode and a few channels.
+
+    """
+    def __init__(self):
+        self.mode = 0
+        self.ch = {i: Channel(self) for i in range(2)}
+
+
+def read_channel(id, ch, group=''):
+    """Build an instruction reading the value of a channel.
+
+    """
+    return GetInstruction(id=id, path='driver.ch[a].value',
+                          ch_ids=OrderedDict(a=str(ch)), parallel_group=group)
+
+
+def prepare(task, instructions, **kwargs):
+    """Add the instructions to the task and prepare it with a new driver.
+
+    """
+    task.add_instructions(0, instructions)
+    for k, v in kwargs.items():
+        setattr(task, k, v)
+    driver = Driver()
+    task.root.resources['instrs'][task.selected_instrument] = (driver, None)
+    task.prepare()
+    return driver
+
+
+def test_split_in_steps():
+    """Only consecutive tagged instructions are grouped, the others keeping
+    their position in the list.
+
+    """
+    a, b, c, d, e, f, g = [read_channel(i, 0, group)
+                           for i, group in zip('abcdefg',
+                                               ['', 'x', 'y', 'x', '', '',
+                                                'x'])]
+    assert _split_in_steps([a, b, c, d, e, f, g]) == [[[a]], [[b, d], [c]],
+                                                      [[e, f]], [[g]]]
+
+
+def test_parallel_perform(task):
+    """Groups run concurrently but untagged instructions act as barriers.
+
+    """
+    set_mode = SetInstruction(id='m', path='driver.mode', value='1')
+    driver = prepare(task,
+                     [read_channel('a', 0, 'x'), read_channel('b', 1, 'y'),
+                      set_mode,
+                      read_channel('c', 0, 'x'), read_channel('d', 1, 'y')],
+                     execution_mode='parallel')
+    assert task._pool is not None
+    task.perform()
+
+    values = {i: task.get_from_database('Test_' + i) for i in 'abcd'}
+    assert values == {'a': 0, 'b': 0, 'c': 1, 'd': 1}
+    assert current_thread() not in driver.ch[0].threads | driver.ch[1].threads
+
+
+def test_parallel_perform_without_groups(task):
+    """Without concurrent groups no pool is created and the instructions are
+    executed in turn.
+
+    """
+    set_mode = SetInstruction(id='m', path='driver.mode', value='1')
+    driver = prepare(task, [read_channel('a', 0), set_mode,
+                            read_channel('b', 1, 'x')],
+                     execution_mode='parallel')
+    assert task._pool is None
+    task.perform()
+
+    assert task.get_from_database('Test_a') == 0
+    assert task.get_from_database('Test_b') == 1
+    assert driver.ch[1].threads == {current_thread()}
+
+
+def test_parallel_pool_released(task):
+    """The pool is shut down when the resources of the root are released.
+
+    """
+    prepare(task, [read_channel('a', 0, 'x'), read_channel('b', 1, 'y')],
+            execution_mode='parallel')
+    pool = task._pool
+    dispatchers = task.root.resources['threads'][task.path + '/' + task.name]
+    assert len(dispatchers) == 1
+
+    task.root.resources['threads'].release()
+    assert dispatchers[0].inactive.is_set()
+    with pytest.raises(RuntimeError):
+        pool.submit(print)
+
+
+@pytest.mark.parametrize('record, in_database', [(True, True), (True, False),
+                                                 (False, True)])
+def test_timings_entry(task, record, in_database):
+    """The timings entry exists only if the timings are recorded and written.
+
+    """
+    task.timings_in_database = in_database
+    task.record_timings = record
+    assert ('timings' in task.database_entries) is (record and in_database)
+
+    task.record_timings = task.timings_in_database = False
+    assert 'timings' not in task.database_entries
+
+
+def test_timings_written_after_run(task):
+    """The summary of the timings is written once the resources are released.
+
+    """
+    prepare(task, [read_channel('a', 0), read_channel('b', 1)],
+            record_timings=True, timings_in_database=True)
+    for _ in range(2):
+        task.perform()
+    assert task.get_from_database('Test_timings') == {}
+
+    task.root.resources['threads'].release()
+    summary = task.get_from_database('Test_timings')
+    assert summary['perform']['count'] == 2
+    assert summary['a']['access']['count'] == 2
+
+
+def test_timings_in_compiled_mode(task):
+    """Only the whole perform is timed in compiled mode.
+
+    """
+    prepare(task, [read_channel('a', 0), read_channel('b', 1)],
+            execution_mode='compiled', record_timings=True)
+    task.perform()
+    assert task.get_from_database('Test_a') == 0
+    assert set(task.timings.summary()) == {'perform'}
+    assert task.timings.perform.count == 1
+
+
+class CheckedGet(GetInstruction):
+    """Get instruction counting how many times it was checked.
+
+    """
+    checks = 0
+
+    def check(self, task, driver_cls):
+        type(self).checks += 1
+        return super(CheckedGet, self).check(task, driver_cls)
+
+
+class DriverClass(object):
+    """Driver class against which the paths are checked.
+
+    """
+    mode = 0
+
+
+def test_check_after_in_place_edition(task):
+    """Instructions edited in place are checked again.
+
+    """
+    instr = CheckedGet(id='a', path='driver.mode',
+                       ch_ids=OrderedDict(a='0'),
+                       hinter=BaseInstructionReturnHinter())
+    task.add_instruction(instr, 0)
+    task.selected_instrument = ('p', 'd', 'c', 's')
+    task.root.run_time = {DRIVER_DEPENDENCY_ID: {'d': (DriverClass, None)}}
+    CheckedGet.checks = 0
+
+    def check():
+        test, traceback = task.check(test_instr=False)
+        assert test, traceback
+        return CheckedGet.checks
+
+    assert check() == 1
+    assert check() == 1
+
+    # The channel ids are not used by the path but are part of the
+    # preferences of the instruction.
+    instr.ch_ids['a'] = '1'
+    assert check() == 2
+    instr.hinter.user_value = '1.0'
+    assert check() == 3
+    assert task.get_from_database('Test_a') == 1.0
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+# -----------------------------------------------------------------------------
+# Copyright 2018 by ExopyI3py Authors, see AUTHORS for more details.
+#
+# Distributed under the terms of the BSD license.
+#
+# The full license is in the file LICENCE, distributed with this software.
+# -----------------------------------------------------------------------------
+"""Test the tools measuring the time spent executing the instructions.
+
+"""
+from math import isnan
+
+import pytest
+
+from exopy_i3py.tasks.tasks.instrumentation import (LatencyHistogram,
+                                                    TimingRecorder,
+                                                    PHASES, WHOLE)
+from exopy_i3py.tasks.instructions.base_instructions import (BaseInstruction,
+                                                             GetInstruction)
+
+
+def test_histogram_binning():
+    """Durations are counted in logarithmically spaced bins, out of range
+    values being counted in the extreme bins.
+
+    """
+    hist = LatencyHistogram(min_value=1e-6, decades=3, bins_per_decade=2)
+    assert len(hist.counts) == 6
+
+    for value in (1e-8, 1e-6, 2e-6, 5e-6, 1.5e-4, 10):
+        hist.record(value)
+    assert hist.counts == [3, 1, 0, 0, 1, 1]
+    assert hist.count == 6
+    assert hist.min == 1e-8
+    assert hist.max == 10
+    assert hist.total == pytest.approx(10.00015801)
+
+
+def test_histogram_percentiles():
+    """Percentiles are estimated within a bin and clipped to the extrema.
+
+    """
+    hist = LatencyHistogram()
+    assert isnan(hist.percentile(50))
+    assert isnan(hist.summary()['mean'])
+
+    for _ in range(90):
+        hist.record(1e-3)
+    for _ in range(10):
+        hist.record(1e-1)
+
+    width = 10**(1/hist.bins_per_decade)
+    assert 1e-3 <= hist.percentile(50) <= 1e-3*width
+    assert hist.percentile(90) == pytest.approx(hist.percentile(50))
+    assert hist.percentile(95) == 1e-1
+    assert hist.percentile(100) == 1e-1
+
+    summary = hist.summary()
+    assert summary['count'] == 100
+    assert summary['mean'] == pytest.approx(0.0109)
+    assert summary['p99'] == 1e-1
+
+
+class Task(object):
+    """Task storing the values written by the instructions.
+
+    """
+    def __init__(self):
+        self.database = {}
+
+    def write_in_database(self, name, value):
+        self.database[name] = value
+
+
+class Driver(object):
+    """Driver exposing a single value.
+
+    """
+    value = 1
+
+
+class DirectInstruction(BaseInstruction):
+    """Instruction overriding execute which cannot be split in phases.
+
+    """
+    def execute(self, task, driver):
+        task.write_in_database(self.id, driver.value)
+
+
+def test_recorder_phases():
+    """Instructions implementing access are timed phase by phase, the others
+    as a whole.
+
+    """
+    split = GetInstruction(id='a', path='driver.value')
+    split.prepare()
+    whole = DirectInstruction(id='', path='driver.value')
+    twin = DirectInstruction(id='', path='driver.value')
+
+    recorder = TimingRecorder()
+    for instr in (split, whole, twin):
+        recorder.register(instr)
+    assert len(recorder.histograms[split]) == len(PHASES)
+    assert len(recorder.histograms[whole]) == len(WHOLE)
+
+    task, driver = Task(), Driver()
+    for _ in range(3):
+        for instr in (split, whole, twin):
+            recorder.execute(instr, task, driver)
+    assert task.database == {'a': 1, '': 1}
+
+    summary = recorder.summary()
+    assert set(summary) == {'perform', 'a', 'driver.value',
+                            'driver.value_1'}
+    assert set(summary['a']) == set(PHASES)
+    assert summary['a']['access']['count'] == 3
+    assert set(summary['driver.value']) == set(WHOLE)
+    assert summary['perform']['count'] == 0